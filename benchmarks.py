@@ -0,0 +1,200 @@
+import argparse
+import gc
+import json
+import os
+import platform
+import random
+import shutil
+import statistics
+import sys
+import tempfile
+import time
+import tracemalloc
+from datetime import date, datetime
+
+from wallet_core import WalletLedger, DEFAULT_CATEGORIES
+from todo_core import TodoList, CATEGORIES, PRIORITIES
+from records import Transaction
+
+# Headless timings of the wallet and to-do hot paths on synthetic data.
+#   python benchmarks.py --sizes 1000 100000 --repeat 5 --output bench_results.json
+SIZES = [1000, 10000, 100000, 1000000]  # 10000000 works too, given the RAM
+REPEAT = 5
+GENERATE_CHUNK = 100000
+WORDS = ["coffee", "rent", "groceries", "fuel", "salary", "cinema", "power bill", "bus pass",
+         "pharmacy", "bakery", "gym", "books", "taxi", "lunch", "insurance", "gift"]
+RESULTS_FILE = "bench_results.json"
+
+
+# --- Generators ---
+def generate_transactions(n, seed=0, start_id=1, years=5):
+    # Yields wallet rows spread over the last few years, roughly 1 in 8 income
+    rng = random.Random(seed)
+    last = date.today().toordinal()
+    first = last - 365 * years
+    day_strings = [date.fromordinal(d).isoformat() for d in range(first, last + 1)]
+    expense_categories = [c for c in DEFAULT_CATEGORIES if c != "Salary"]
+    for i in range(n):
+        income = rng.random() < 0.125
+        yield {
+            'id': start_id + i,
+            'date': rng.choice(day_strings),
+            'type': 'Income' if income else 'Expense',
+            'category': 'Salary' if income else rng.choice(expense_categories),
+            'amount': round(rng.uniform(500, 4000) if income else rng.expovariate(1 / 40), 2) or 0.01,
+            'description': f"{rng.choice(WORDS)} {rng.randint(1, 999)}",
+        }
+
+
+def generate_ledger(n, workdir, storage_mode="snapshot", seed=0):
+    ledger = WalletLedger(storage_mode, os.path.join(workdir, "transactions.json"),
+                          os.path.join(workdir, "transactions.db"))
+    ledger.load()
+    rows = generate_transactions(n, seed)
+    while True:
+        chunk = [Transaction.from_dict(tx) for _, tx in zip(range(GENERATE_CHUNK), rows)]
+        if not chunk:
+            break
+        ledger.transactions.extend(chunk)
+    ledger.apply(({'budget_limits': {c: 300.0 for c in DEFAULT_CATEGORIES if c != "Salary"}},
+                  ledger.transactions, ledger.transactions.aggregate_cells()))
+    return ledger
+
+
+def generate_tasks(n, seed=0):
+    rng = random.Random(seed)
+    todo = TodoList()
+    for _ in range(n):
+        t = todo.add(f"{rng.choice(WORDS)} {rng.randint(1, 9999)}", rng.choice(CATEGORIES), rng.choice(PRIORITIES))
+        if rng.random() < 0.3:
+            todo.toggle(t.id)
+    return todo
+
+
+# --- Cases ---
+# name -> setup(n, workdir) returning the state run(state) works on.
+# The wallet's Tk methods are thin over WalletLedger, so its calls stand in for them.
+def _this_month():
+    return datetime.now().strftime("%Y-%m")
+
+
+def _filter(ledger):
+    return ledger.filter_transactions("coffee", "All", "Expense", _this_month()[:4])
+
+
+def _refresh(ledger):
+    # what a full _refresh_ui rebuilds: the table index, the stats and the budget view
+    ledger.filter_indices(month=_this_month())
+    ledger.overview()
+    ledger.budget_status()
+
+
+def _save(ledger):
+    ledger.write_snapshot(ledger.snapshot_payload())
+
+
+def _load(ledger):
+    fresh = WalletLedger("snapshot", ledger.data_file)
+    fresh.apply(fresh.read())
+
+
+def _setup_saved(n, workdir):
+    ledger = generate_ledger(n, workdir)
+    ledger.save()
+    return ledger
+
+
+def _setup_import(n, workdir):
+    path = os.path.join(workdir, "import.json")
+    with open(path, 'w', encoding='utf-8') as f:
+        json.dump({'transactions': list(generate_transactions(n, seed=1))}, f)
+    return path
+
+
+def _import(path):
+    ledger = WalletLedger("snapshot", os.path.join(os.path.dirname(path), "imported.json"),
+                          on_snapshot_save=lambda: None)
+    ledger.import_json(path)
+
+
+def _todo_refresh(todo):
+    # _refresh_view: the filtered table rows plus the stats line
+    list(todo.filter("coffee", "All", "Pending"))
+    todo.stats()
+
+
+CASES = {
+    'wallet.filter_transactions': (generate_ledger, _filter),
+    'wallet.refresh_ui': (generate_ledger, _refresh),
+    'wallet.update_budget_display': (generate_ledger, lambda ledger: ledger.budget_status()),
+    'wallet.save_data': (generate_ledger, _save),
+    'wallet.load_data': (_setup_saved, _load),
+    'wallet.import_json': (_setup_import, _import),
+    'todo.refresh_view': (lambda n, workdir: generate_tasks(n), _todo_refresh),
+}
+
+
+# --- Measurement ---
+def measure(run, state, repeat):
+    gc.collect()
+    wall = []
+    for _ in range(repeat):
+        started = time.perf_counter()
+        run(state)
+        wall.append(time.perf_counter() - started)
+    # one more run under tracemalloc for memory; it slows the code, so it isn't timed
+    gc.collect()
+    blocks = sys.getallocatedblocks()
+    tracemalloc.start()
+    run(state)
+    _, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    return {
+        'wall_s': {'min': min(wall), 'median': statistics.median(wall), 'max': max(wall)},
+        'peak_bytes': peak,
+        'net_allocated_blocks': sys.getallocatedblocks() - blocks,
+    }
+
+
+def run_benchmarks(sizes=SIZES, names=None, repeat=REPEAT, log=print):
+    results = []
+    for name, (setup, run) in CASES.items():
+        if names and not any(name.startswith(prefix) for prefix in names):
+            continue
+        for n in sizes:
+            workdir = tempfile.mkdtemp(prefix="wallet-bench-")
+            try:
+                started = time.perf_counter()
+                state = setup(n, workdir)
+                setup_s = time.perf_counter() - started
+                result = dict(case=name, size=n, setup_s=setup_s, **measure(run, state, repeat))
+            finally:
+                shutil.rmtree(workdir, ignore_errors=True)
+            results.append(result)
+            log(f"{name:<30}{n:>10,}  {result['wall_s']['median'] * 1000:10.2f} ms"
+                f"  {result['peak_bytes'] / 1e6:9.1f} MB peak")
+    return results
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Benchmark the wallet and to-do hot paths")
+    parser.add_argument('--sizes', type=int, nargs='+', default=SIZES)
+    parser.add_argument('--cases', nargs='+', help="case name prefixes, e.g. wallet.filter todo")
+    parser.add_argument('--repeat', type=int, default=REPEAT)
+    parser.add_argument('--output', default=RESULTS_FILE)
+    args = parser.parse_args(argv)
+
+    results = run_benchmarks(args.sizes, args.cases, args.repeat)
+    with open(args.output, 'w', encoding='utf-8') as f:
+        json.dump({
+            'created': datetime.now().isoformat(),
+            'python': sys.version.split()[0],
+            'platform': platform.platform(),
+            'repeat': args.repeat,
+            'results': results,
+        }, f, indent=2)
+    print(f"Wrote {len(results)} results to {args.output}")
+
+
+if __name__ == '__main__':
+    main()
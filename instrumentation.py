@@ -0,0 +1,159 @@
+import functools
+import json
+import os
+import sys
+import threading
+import time
+
+# Opt-in timing of the apps' hot paths. Off by default; an instrumented call
+# then costs one attribute check. Turn it on with --profile (or
+# --profile=trace.json to also write a Chrome trace on exit, viewable in
+# chrome://tracing or ui.perfetto.dev), or set PERF_PROFILE to 1 or a path.
+PROFILE_ENV = "PERF_PROFILE"
+BUCKETS = 25              # latency histogram buckets: <1us, 1-2us, 2-4us, ... >=2**23us (~8s)
+MAX_TRACE_EVENTS = 200000  # spans kept for the trace; later ones are only counted
+
+
+class Stat:
+    __slots__ = ('count', 'total', 'max', 'blocks', 'histogram')
+
+    def __init__(self):
+        self.count = 0
+        self.total = 0.0   # seconds
+        self.max = 0.0
+        self.blocks = 0    # net allocated blocks across all calls
+        self.histogram = [0] * BUCKETS
+
+    def add(self, seconds, blocks):
+        self.count += 1
+        self.total += seconds
+        self.max = max(self.max, seconds)
+        self.blocks += blocks
+        self.histogram[min(BUCKETS - 1, int(seconds * 1e6).bit_length())] += 1
+
+    def percentile(self, fraction):
+        # upper edge of the bucket holding that share of calls, in seconds
+        wanted, seen = fraction * self.count, 0
+        for bucket, n in enumerate(self.histogram):
+            seen += n
+            if n and seen >= wanted:
+                return min(self.max, (1 << bucket) / 1e6)
+        return self.max
+
+
+class Profiler:
+    def __init__(self):
+        self.enabled = False
+        self.trace_path = None
+        self._lock = threading.Lock()
+        self._origin = time.perf_counter()
+        self.reset()
+
+    def reset(self):
+        with self._lock:
+            self.stats = {}   # span name -> Stat
+            self.events = []  # Chrome trace 'X' events, timestamps from the profiler's start
+            self.dropped = 0
+
+    def enable(self, trace_path=None):
+        self.enabled = True
+        self.trace_path = trace_path or self.trace_path
+
+    def record(self, name, started, seconds, blocks):
+        with self._lock:
+            stat = self.stats.get(name)
+            if stat is None:
+                stat = self.stats[name] = Stat()
+            stat.add(seconds, blocks)
+            if len(self.events) < MAX_TRACE_EVENTS:
+                self.events.append({
+                    'name': name, 'ph': 'X', 'pid': os.getpid(), 'tid': threading.get_ident(),
+                    'ts': (started - self._origin) * 1e6, 'dur': seconds * 1e6,
+                    'args': {'alloc_blocks': blocks},
+                })
+            else:
+                self.dropped += 1
+
+    def span(self, name):
+        return _Span(self, name) if self.enabled else _NO_SPAN
+
+    def summary(self):
+        # (name, calls, mean, p50, p95, max, blocks per call), slowest total first; times in seconds
+        with self._lock:
+            items = list(self.stats.items())
+        items.sort(key=lambda item: -item[1].total)
+        return [(name, s.count, s.total / s.count, s.percentile(0.5), s.percentile(0.95), s.max,
+                 s.blocks / s.count) for name, s in items]
+
+    def dump_trace(self, path):
+        with self._lock:
+            events = list(self.events)
+        with open(path, 'w', encoding='utf-8') as f:
+            json.dump({'traceEvents': events, 'displayTimeUnit': 'ms',
+                       'otherData': {'dropped_events': self.dropped}}, f)
+        return len(events)
+
+    def finish(self):
+        # On exit: write the trace if one was asked for
+        if self.enabled and self.trace_path:
+            self.dump_trace(self.trace_path)
+
+
+class _Span:
+    # allocation delta is sys.getallocatedblocks(): process-wide and cheap,
+    # so other threads' work during the span shows up in it too
+    __slots__ = ('profiler', 'name', 'started', 'blocks')
+
+    def __init__(self, profiler, name):
+        self.profiler = profiler
+        self.name = name
+
+    def __enter__(self):
+        self.blocks = sys.getallocatedblocks()
+        self.started = time.perf_counter()
+        return self
+
+    def __exit__(self, *exc):
+        seconds = time.perf_counter() - self.started
+        self.profiler.record(self.name, self.started, seconds, sys.getallocatedblocks() - self.blocks)
+        return False
+
+
+class _NoSpan:
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        return False
+
+
+_NO_SPAN = _NoSpan()
+PROFILER = Profiler()
+
+
+def instrumented(name):
+    # Decorator; the check happens per call, so enabling later takes effect at once
+    def wrap(fn):
+        @functools.wraps(fn)
+        def call(*args, **kwargs):
+            if not PROFILER.enabled:
+                return fn(*args, **kwargs)
+            with _Span(PROFILER, name):
+                return fn(*args, **kwargs)
+        return call
+    return wrap
+
+
+def enable_from(argv=None, environ=None):
+    # --profile / --profile=trace.json, else PERF_PROFILE=1 / PERF_PROFILE=trace.json
+    argv = sys.argv if argv is None else argv
+    environ = os.environ if environ is None else environ
+    for arg in argv[1:]:
+        if arg == '--profile' or arg.startswith('--profile='):
+            PROFILER.enable(arg.partition('=')[2] or None)
+            return True
+    value = environ.get(PROFILE_ENV, "")
+    if value and value != "0":
+        PROFILER.enable(None if value == "1" else value)
+        return True
+    return False
@@ -0,0 +1,114 @@
+import queue
+import threading
+from concurrent.futures import ThreadPoolExecutor
+
+POLL_MS = 50
+MAX_PENDING_PROGRESS = 4  # emitted-but-unhandled progress items before a worker waits
+
+
+class IOJob:
+    def __init__(self, executor, key, generation):
+        self._executor = executor
+        self.key = key
+        self.generation = generation
+        self._slots = threading.Semaphore(MAX_PENDING_PROGRESS)
+
+    def cancelled(self):
+        # True once newer work was submitted under the same key
+        return self._executor._generations.get(self.key) != self.generation
+
+    def emit(self, value):
+        # Hand a partial result to on_progress on the UI thread; blocks while the UI is behind
+        while not self._slots.acquire(timeout=0.1):
+            if self.cancelled():
+                return
+        self._executor._results.put((self, 'progress', value))
+
+
+class IOExecutor:
+    # Runs blocking work on a small thread pool and delivers results back on the
+    # Tk thread by polling a queue with after(). Work is keyed: while a key is
+    # running, later submissions collapse into one pending run, and a running
+    # job whose key was resubmitted is treated as cancelled.
+    def __init__(self, widget, workers=2, poll_ms=POLL_MS):
+        self.widget = widget
+        self.poll_ms = poll_ms
+        self._pool = ThreadPoolExecutor(max_workers=workers, thread_name_prefix="wallet-io")
+        self._results = queue.Queue()
+        self._generations = {}
+        self._running = {}   # key -> (job, callbacks)
+        self._pending = {}   # key -> latest submission waiting for the running one
+        self._poll_id = None
+
+    def submit(self, key, fn, *args, prepare=None, on_done=None, on_error=None, on_progress=None):
+        # fn(job, *args[, prepare()]) runs on a worker; prepare() runs on the UI thread at dispatch
+        generation = self._generations.get(key, 0) + 1
+        self._generations[key] = generation
+        work = (generation, fn, args, prepare, (on_done, on_error, on_progress))
+        if key in self._running:
+            self._pending[key] = work
+        else:
+            self._dispatch(key, work)
+
+    def busy(self, key):
+        return key in self._running or key in self._pending
+
+    def _dispatch(self, key, work):
+        generation, fn, args, prepare, callbacks = work
+        job = IOJob(self, key, generation)
+        self._running[key] = (job, callbacks)
+        try:
+            if prepare is not None:
+                args = args + (prepare(),)
+        except Exception as e:
+            self._results.put((job, 'error', e))
+        else:
+            self._pool.submit(self._run, job, fn, args)
+        self._schedule_poll()
+
+    def _run(self, job, fn, args):
+        try:
+            self._results.put((job, 'done', fn(job, *args)))
+        except Exception as e:
+            self._results.put((job, 'error', e))
+
+    def _schedule_poll(self):
+        if self._poll_id is None:
+            self._poll_id = self.widget.after(self.poll_ms, self._poll)
+
+    def _poll(self):
+        self._poll_id = None
+        while True:
+            try:
+                job, kind, value = self._results.get_nowait()
+            except queue.Empty:
+                break
+            _, callbacks = self._running.get(job.key, (None, (None, None, None)))
+            on_done, on_error, on_progress = callbacks
+            current = not job.cancelled()
+            if kind == 'progress':
+                job._slots.release()
+                if current and on_progress is not None:
+                    on_progress(value)
+                continue
+            del self._running[job.key]
+            if current:
+                callback = on_done if kind == 'done' else on_error
+                if callback is not None:
+                    callback(value)
+            if job.key in self._pending:
+                self._dispatch(job.key, self._pending.pop(job.key))
+        if self._running:
+            self._schedule_poll()
+
+    def close(self):
+        # Running jobs are told to stop (writes ignore it and complete), then
+        # whatever was still waiting runs inline
+        for key in list(self._running):
+            self._generations[key] += 1
+        self._pool.shutdown(wait=True)
+        pending, self._pending = self._pending, {}
+        for key, (generation, fn, args, prepare, _) in pending.items():
+            if prepare is not None:
+                args = args + (prepare(),)
+            fn(IOJob(self, key, generation), *args)
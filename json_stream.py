@@ -0,0 +1,89 @@
+import json
+
+CHUNK_SIZE = 1 << 16
+
+_decoder = json.JSONDecoder()
+_WHITESPACE = " \t\n\r"
+
+
+class JsonStreamReader:
+    # Walks a top-level JSON object from a text file in fixed-size chunks.
+    # One array member is yielded element by element; every other member is
+    # decoded whole (they are small: categories, budget_limits, ...).
+    def __init__(self, f, chunk_size=CHUNK_SIZE):
+        self.f = f
+        self.chunk_size = chunk_size
+        self.buf = ""
+        self.pos = 0
+        self.chars_read = 0
+        self.eof = False
+
+    def _fill(self):
+        chunk = self.f.read(self.chunk_size)
+        if not chunk:
+            self.eof = True
+            return False
+        self.chars_read += len(chunk)
+        self.buf = self.buf[self.pos:] + chunk
+        self.pos = 0
+        return True
+
+    def _peek(self):
+        # next non-whitespace character, without consuming it
+        while True:
+            while self.pos < len(self.buf) and self.buf[self.pos] in _WHITESPACE:
+                self.pos += 1
+            if self.pos < len(self.buf):
+                return self.buf[self.pos]
+            if not self._fill():
+                raise ValueError("Unexpected end of JSON data")
+
+    def _expect(self, char):
+        if self._peek() != char:
+            raise ValueError(f"Expected '{char}' at offset {self.chars_read - len(self.buf) + self.pos}")
+        self.pos += 1
+
+    def _value(self):
+        self._peek()
+        while True:
+            try:
+                value, end = _decoder.raw_decode(self.buf, self.pos)
+            except json.JSONDecodeError:
+                if not self._fill():
+                    raise
+                continue
+            # a number ending exactly at the buffer edge may continue in the next chunk
+            if end == len(self.buf) and not self.eof and self._fill():
+                continue
+            self.pos = end
+            return value
+
+    def members(self, array_key):
+        # yields (key, value) pairs; members of array_key come out one element at a time
+        self._expect('{')
+        if self._peek() == '}':
+            return
+        while True:
+            key = self._value()
+            self._expect(':')
+            if key == array_key:
+                if self._peek() != '[':
+                    raise ValueError(f"'{array_key}' must be a list")
+                self.pos += 1
+                if self._peek() == ']':
+                    self.pos += 1
+                else:
+                    while True:
+                        yield key, self._value()
+                        if self._peek() == ',':
+                            self.pos += 1
+                            continue
+                        self._expect(']')
+                        break
+            else:
+                yield key, self._value()
+            if self._peek() == ',':
+                self.pos += 1
+                continue
+            self._expect('}')
+            return
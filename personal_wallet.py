@@ -1,21 +1,28 @@
-import json
+import time
+_IMPORT_START = time.perf_counter()
 import os
-import csv
+import sys
 from datetime import datetime, timedelta
 import tkinter as tk
 from tkinter import ttk, messagebox, filedialog
-from matplotlib.figure import Figure
-from matplotlib.backends.backend_tkagg import FigureCanvasTkAgg
-import matplotlib.pyplot as plt
-from collections import defaultdict
-
-plt.rcParams['font.family'] = 'Segoe UI'
-
-DATA_FILE = "transactions.json"
-DEFAULT_CATEGORIES = ["Salary", "Groceries", "Transport", "Entertainment", "Utilities", "Other"]
+from wallet_core import WalletLedger
+from refresh_scheduler import RefreshScheduler
+from wallet_charts import ChartBlitter, update_pie
+from io_executor import IOExecutor
+from instrumentation import PROFILER, instrumented, enable_from
+# matplotlib is imported by _build_charts() the first time the Analytics tab is shown
+IMPORT_SECONDS = time.perf_counter() - _IMPORT_START
+
+VIRTUAL_LIST = True  # only create Treeview rows for the visible window of the transaction history
+# Add Transaction's Repeat choices -> (frequency, interval) of a recurring rule, None for a one-off
+REPEAT_CHOICES = {"Once": None, "Monthly": ('monthly', 1), "Weekly": ('weekly', 1),
+                  "Every 2 weeks": ('weekly', 2), "Every 4 weeks": ('weekly', 4)}
+RECURRING_MARK = "↻"  # id column of a recurring occurrence in the non-virtual history
+TREE_BUFFER_ROWS = 10
+PERF_REFRESH_MS = 1000  # Performance tab redraw interval while it is showing
 
 class PersonalWalletAdvancedApp(tk.Tk):
-    def __init__(self):
+    def __init__(self, startup_timing=False):
         super().__init__()
         self.title("💰 Personal Wallet - Advanced Edition")
         self.geometry("1200x800")
@@ -43,12 +50,34 @@ class PersonalWalletAdvancedApp(tk.Tk):
         style.configure("Stats.TButton", background="#4CAF50", foreground="white")
         style.map("Stats.TButton", background=[('active', '#45A049')])
 
-        self.transactions = []
-        self.categories = list(DEFAULT_CATEGORIES)
-        self.budget_limits = {}
+        # All ledger state and logic lives in the headless WalletLedger
+        self.ledger = WalletLedger(on_snapshot_save=self._save_data)
+        self._view_index = []  # keys into the ledger's store that pass the filters, ascending by _sort_column
+        self._view_extra = []  # recurring occurrences in the view; key -1 - j is _view_extra[j]
+        self._sort_column = None  # None keeps insertion order
+        self._sort_descending = False
+        self._tree_offset = 0
+        self._tree_rows = 12
+        self._selected_ids = set()
+        self._window_ids = set()
+        self._loading = False
+        self._exports = set()    # target paths of exports still running
+        self._load_error = None  # set when the data file can't be read; changes are then refused
         self.current_month_filter = datetime.now().strftime("%Y-%m")
+        self._io = IOExecutor(self)
+        self.protocol("WM_DELETE_WINDOW", self._on_close)
+        # phase -> seconds, reported once the loaded data has been shown
+        self._startup_timing = {'imports': IMPORT_SECONDS} if startup_timing else None
 
+        started = time.perf_counter()
         self._build_ui()
+        self._time_startup('_build_ui', started)
+        self._refresh = RefreshScheduler(self, {
+            'table': self._refresh_table,
+            'stats': self._refresh_stats,
+            'charts': self._update_charts,
+            'budget': self._update_budget_display,
+        }, name="wallet._refresh_ui")
         self._load_data()
         self._refresh_ui()
 
@@ -76,6 +105,14 @@ class PersonalWalletAdvancedApp(tk.Tk):
         self._build_transactions_tab()
         self._build_analytics_tab()
         self._build_budget_tab()
+        self.notebook.bind('<<NotebookTabChanged>>', lambda e: self._update_charts())
+
+        # Tab 4: Performance, hidden unless profiling (--profile) or toggled with Ctrl+Shift+P
+        self.perf_tab = None
+        self._perf_after = None
+        self.bind('<Control-P>', self._toggle_performance_tab)
+        if PROFILER.enabled:
+            self._build_performance_tab()
 
     def _build_transactions_tab(self):
         container = ttk.Frame(self.tab1, padding=15)
@@ -95,9 +132,9 @@ class PersonalWalletAdvancedApp(tk.Tk):
 
         ttk.Label(top, text="Category:").grid(row=0, column=4, sticky=tk.W, padx=(10,0))
         self.category_var = tk.StringVar()
-        self.category_combo = ttk.Combobox(top, textvariable=self.category_var, values=self.categories, state="readonly", width=18)
+        self.category_combo = ttk.Combobox(top, textvariable=self.category_var, values=self.ledger.categories, state="readonly", width=18)
         self.category_combo.grid(row=0, column=5)
-        self.category_combo.set(self.categories[0])
+        self.category_combo.set(self.ledger.categories[0])
 
         ttk.Label(top, text="Description:").grid(row=1, column=0, sticky=tk.W, pady=(8,0))
         self.desc_var = tk.StringVar()
@@ -107,8 +144,13 @@ class PersonalWalletAdvancedApp(tk.Tk):
         self.date_var = tk.StringVar(value=datetime.now().strftime("%Y-%m-%d"))
         ttk.Entry(top, textvariable=self.date_var, width=14).grid(row=1, column=5, pady=(8,0))
 
+        ttk.Label(top, text="Repeat:").grid(row=2, column=0, sticky=tk.W, pady=(8,0))
+        self.repeat_var = tk.StringVar(value="Once")
+        ttk.Combobox(top, textvariable=self.repeat_var, values=list(REPEAT_CHOICES), state="readonly",
+                     width=13).grid(row=2, column=1, padx=5, pady=(8,0), sticky=tk.W)
+
         add_btn = ttk.Button(top, text="➕ Add", command=self.add_transaction, style="Add.TButton")
-        add_btn.grid(row=0, column=6, rowspan=2, padx=(15,0), sticky=tk.N+tk.S+tk.E+tk.W)
+        add_btn.grid(row=0, column=6, rowspan=3, padx=(15,0), sticky=tk.N+tk.S+tk.E+tk.W)
 
         # --- Search and Filter Frame ---
         filter_frame = ttk.Labelframe(container, text="Search & Filter", padding=10)
@@ -116,28 +158,28 @@ class PersonalWalletAdvancedApp(tk.Tk):
 
         ttk.Label(filter_frame, text="Search:").grid(row=0, column=0, sticky=tk.W)
         self.search_var = tk.StringVar()
-        self.search_var.trace('w', self._refresh_ui)
+        self.search_var.trace('w', lambda *args: self._refresh.mark('table'))
         ttk.Entry(filter_frame, textvariable=self.search_var, width=20).grid(row=0, column=1, padx=5)
 
         ttk.Label(filter_frame, text="Category:").grid(row=0, column=2, sticky=tk.W, padx=(10,0))
         self.filter_category_var = tk.StringVar(value="All")
-        categories_all = ["All"] + self.categories
+        categories_all = ["All"] + self.ledger.categories
         self.filter_category_combo = ttk.Combobox(filter_frame, textvariable=self.filter_category_var, 
                                                 values=categories_all, state="readonly", width=15)
         self.filter_category_combo.grid(row=0, column=3, padx=5)
-        self.filter_category_combo.bind('<<ComboboxSelected>>', lambda e: self._refresh_ui())
+        self.filter_category_combo.bind('<<ComboboxSelected>>', lambda e: self._refresh.mark('table'))
 
         ttk.Label(filter_frame, text="Type:").grid(row=0, column=4, sticky=tk.W, padx=(10,0))
         self.filter_type_var = tk.StringVar(value="All")
         ttk.Combobox(filter_frame, textvariable=self.filter_type_var, 
                     values=["All", "Income", "Expense"], state="readonly", width=12).grid(row=0, column=5, padx=5)
-        self.filter_type_var.trace('w', lambda *args: self._refresh_ui())
+        self.filter_type_var.trace('w', lambda *args: self._refresh.mark('table'))
 
         ttk.Label(filter_frame, text="Month:").grid(row=0, column=6, sticky=tk.W, padx=(10,0))
         self.month_var = tk.StringVar(value=self.current_month_filter)
         month_entry = ttk.Entry(filter_frame, textvariable=self.month_var, width=10)
         month_entry.grid(row=0, column=7, padx=5)
-        self.month_var.trace('w', lambda *args: self._refresh_ui())
+        self.month_var.trace('w', lambda *args: self._refresh.mark('table'))
 
         ttk.Button(filter_frame, text="Clear Filters", command=self.clear_filters).grid(row=0, column=8, padx=10)
 
@@ -157,13 +199,21 @@ class PersonalWalletAdvancedApp(tk.Tk):
         columns = ("id", "date", "type", "category", "amount", "description")
         self.tree = ttk.Treeview(mid, columns=columns, show="headings", height=12)
         for c in columns:
-            self.tree.heading(c, text=c.capitalize())
+            self.tree.heading(c, text=c.capitalize(), command=lambda c=c: self._sort_by(c))
             self.tree.column(c, anchor=tk.CENTER)
         self.tree.pack(side=tk.LEFT, fill=tk.BOTH, expand=True)
 
-        scrollbar = ttk.Scrollbar(mid, orient=tk.VERTICAL, command=self.tree.yview)
-        self.tree.configure(yscroll=scrollbar.set)
-        scrollbar.pack(side=tk.RIGHT, fill=tk.Y)
+        if VIRTUAL_LIST:
+            self.tree_scrollbar = ttk.Scrollbar(mid, orient=tk.VERTICAL, command=self._on_tree_scroll)
+            self.tree.bind('<Configure>', self._on_tree_resize)
+            self.tree.bind('<<TreeviewSelect>>', self._on_tree_select)
+            self.tree.bind('<MouseWheel>', lambda e: self._scroll_tree(-1 if e.delta > 0 else 1, 'units'))
+            self.tree.bind('<Button-4>', lambda e: self._scroll_tree(-1, 'units'))
+            self.tree.bind('<Button-5>', lambda e: self._scroll_tree(1, 'units'))
+        else:
+            self.tree_scrollbar = ttk.Scrollbar(mid, orient=tk.VERTICAL, command=self.tree.yview)
+            self.tree.configure(yscroll=self.tree_scrollbar.set)
+        self.tree_scrollbar.pack(side=tk.RIGHT, fill=tk.Y)
 
         # --- Bottom Section ---
         bot = ttk.Frame(container, padding=10)
@@ -177,9 +227,13 @@ class PersonalWalletAdvancedApp(tk.Tk):
         stats_label = tk.Label(bot, textvariable=self.stats_var, font=("Segoe UI", 10), bg="#F6F8FA")
         stats_label.pack(side=tk.LEFT, padx=20)
 
+        self.status_var = tk.StringVar(value="")
+        tk.Label(bot, textvariable=self.status_var, font=("Segoe UI", 9), fg="#555555", bg="#F6F8FA").pack(side=tk.LEFT)
+
         ttk.Button(bot, text="🗑️ Delete Selected", command=self.delete_selected, style="Delete.TButton").pack(side=tk.RIGHT, padx=4)
         ttk.Button(bot, text="📤 Export CSV", command=self.export_csv, style="Export.TButton").pack(side=tk.RIGHT, padx=4)
         ttk.Button(bot, text="📥 Import JSON", command=self.import_json, style="Import.TButton").pack(side=tk.RIGHT, padx=4)
+        ttk.Button(bot, text="🏦 Import Statement", command=self.import_statement, style="Import.TButton").pack(side=tk.RIGHT, padx=4)
 
     def _build_analytics_tab(self):
         container = ttk.Frame(self.tab2, padding=15)
@@ -193,24 +247,44 @@ class PersonalWalletAdvancedApp(tk.Tk):
         self.stats_text.pack(fill=tk.BOTH, expand=True)
 
         # Charts Frame
-        charts_frame = ttk.Frame(container)
-        charts_frame.pack(fill=tk.BOTH, expand=True)
+        self.charts_frame = ttk.Frame(container)
+        self.charts_frame.pack(fill=tk.BOTH, expand=True)
+
+        # Placeholder until the tab is first opened and matplotlib is loaded
+        self._charts_placeholder = ttk.Label(self.charts_frame, text="📊 Loading charts...", anchor='center')
+        self._charts_placeholder.pack(fill=tk.BOTH, expand=True)
+        self.pie_canvas = None
+        self._charts_version = None
+
+    def _build_charts(self):
+        import matplotlib
+        from matplotlib.figure import Figure
+        from matplotlib.backends.backend_tkagg import FigureCanvasTkAgg
+        matplotlib.rcParams['font.family'] = 'Segoe UI'
+        self._charts_placeholder.destroy()
 
         # Pie Chart
-        pie_frame = ttk.Labelframe(charts_frame, text="Expense Categories Distribution", padding=10)
+        pie_frame = ttk.Labelframe(self.charts_frame, text="Expense Categories Distribution", padding=10)
         pie_frame.pack(side=tk.LEFT, fill=tk.BOTH, expand=True, padx=(0,5))
 
         self.pie_figure = Figure(figsize=(6, 4), dpi=100)
         self.pie_canvas = FigureCanvasTkAgg(self.pie_figure, pie_frame)
         self.pie_canvas.get_tk_widget().pack(fill=tk.BOTH, expand=True)
+        self._pie_blitter = ChartBlitter(self.pie_canvas)
+        self._pie_categories = None
+        self._pie_artists = None
 
         # Monthly Trend
-        trend_frame = ttk.Labelframe(charts_frame, text="Monthly Income vs Expenses", padding=10)
+        trend_frame = ttk.Labelframe(self.charts_frame, text="Monthly Income vs Expenses", padding=10)
         trend_frame.pack(side=tk.RIGHT, fill=tk.BOTH, expand=True, padx=(5,0))
 
         self.trend_figure = Figure(figsize=(6, 4), dpi=100)
         self.trend_canvas = FigureCanvasTkAgg(self.trend_figure, trend_frame)
         self.trend_canvas.get_tk_widget().pack(fill=tk.BOTH, expand=True)
+        self._trend_blitter = ChartBlitter(self.trend_canvas)
+        self._trend_months = None
+        self._trend_ax = None
+        self._trend_bars = []
 
     def _build_budget_tab(self):
         container = ttk.Frame(self.tab3, padding=15)
@@ -223,10 +297,10 @@ class PersonalWalletAdvancedApp(tk.Tk):
         ttk.Label(setup_frame, text="Category:").grid(row=0, column=0, sticky=tk.W)
         self.budget_category_var = tk.StringVar()
         self.budget_category_combo = ttk.Combobox(setup_frame, textvariable=self.budget_category_var, 
-                                                values=self.categories, state="readonly", width=15)
+                                                values=self.ledger.categories, state="readonly", width=15)
         self.budget_category_combo.grid(row=0, column=1, padx=5)
-        if self.categories:
-            self.budget_category_combo.set(self.categories[0])
+        if self.ledger.categories:
+            self.budget_category_combo.set(self.ledger.categories[0])
 
         ttk.Label(setup_frame, text="Monthly Limit:").grid(row=0, column=2, sticky=tk.W, padx=(10,0))
         self.budget_amount_var = tk.StringVar()
@@ -234,11 +308,18 @@ class PersonalWalletAdvancedApp(tk.Tk):
 
         ttk.Button(setup_frame, text="Set Budget", command=self.set_budget, style="Add.TButton").grid(row=0, column=4, padx=5)
 
+        ttk.Label(setup_frame, text="Month:").grid(row=0, column=5, sticky=tk.W, padx=(20,0))
+        self.budget_month_var = tk.StringVar(value=self.current_month_filter)
+        self.budget_month_combo = ttk.Combobox(setup_frame, textvariable=self.budget_month_var,
+                                             values=[self.current_month_filter], state="readonly", width=10)
+        self.budget_month_combo.grid(row=0, column=6, padx=5)
+        self.budget_month_var.trace_add('write', lambda *a: self._refresh.mark('budget', delay=0))
+
         # Budget Overview
         overview_frame = ttk.Labelframe(container, text="Budget Overview", padding=10)
         overview_frame.pack(fill=tk.BOTH, expand=True)
 
-        columns = ("category", "budget", "spent", "remaining", "status")
+        columns = ("category", "budget", "spent", "forecast", "remaining", "status")
         self.budget_tree = ttk.Treeview(overview_frame, columns=columns, show="headings", height=12)
         for col in columns:
             self.budget_tree.heading(col, text=col.capitalize())
@@ -256,75 +337,206 @@ class PersonalWalletAdvancedApp(tk.Tk):
         self.alerts_text = tk.Text(self.alerts_frame, height=4, font=("Segoe UI", 9), bg="#FFF3CD")
         self.alerts_text.pack(fill=tk.BOTH, expand=True)
 
+        # Recurring Rules Frame
+        recurring_frame = ttk.Labelframe(container, text="Recurring Transactions", padding=10)
+        recurring_frame.pack(fill=tk.X, pady=(10,0))
+
+        columns = ("id", "type", "category", "amount", "description", "repeat", "start", "end")
+        self.recurring_tree = ttk.Treeview(recurring_frame, columns=columns, show="headings", height=4)
+        for col in columns:
+            self.recurring_tree.heading(col, text=col.capitalize())
+            self.recurring_tree.column(col, anchor=tk.CENTER, width=90)
+        self.recurring_tree.column("id", width=40)
+        self.recurring_tree.pack(side=tk.LEFT, fill=tk.X, expand=True)
+
+        ttk.Button(recurring_frame, text="Remove Selected", command=self.remove_selected_recurring,
+                   style="Delete.TButton").pack(side=tk.LEFT, padx=(10,0))
+
+    def _build_performance_tab(self):
+        self.perf_tab = ttk.Frame(self.notebook)
+        self.notebook.add(self.perf_tab, text="⏱️ Performance")
+        container = ttk.Frame(self.perf_tab, padding=15)
+        container.pack(fill=tk.BOTH, expand=True)
+
+        bar = ttk.Frame(container)
+        bar.pack(fill=tk.X, pady=(0,10))
+        ttk.Button(bar, text="Reset", command=self._reset_profile).pack(side=tk.LEFT)
+        ttk.Button(bar, text="Save Trace...", command=self._save_trace, style="Export.TButton").pack(side=tk.LEFT, padx=5)
+        self.perf_status_var = tk.StringVar()
+        ttk.Label(bar, textvariable=self.perf_status_var).pack(side=tk.RIGHT)
+
+        columns = ("path", "calls", "mean", "p50", "p95", "max", "blocks")
+        headings = ("Path", "Calls", "Mean ms", "p50 ms", "p95 ms", "Max ms", "Alloc blocks/call")
+        self.perf_tree = ttk.Treeview(container, columns=columns, show="headings", height=16)
+        for col, text in zip(columns, headings):
+            self.perf_tree.heading(col, text=text)
+            self.perf_tree.column(col, anchor=tk.W if col == "path" else tk.E, width=260 if col == "path" else 90)
+        self.perf_tree.pack(side=tk.LEFT, fill=tk.BOTH, expand=True)
+        scrollbar = ttk.Scrollbar(container, orient=tk.VERTICAL, command=self.perf_tree.yview)
+        self.perf_tree.configure(yscroll=scrollbar.set)
+        scrollbar.pack(side=tk.RIGHT, fill=tk.Y)
+        self._update_performance_tab()
+
     # --- Category Functions ---
+    def _sync_category_widgets(self):
+        categories = self.ledger.categories
+        self.category_combo['values'] = categories
+        self.filter_category_combo['values'] = ["All"] + categories
+        self.budget_category_combo['values'] = categories
+
     def add_category(self):
-        name = self.new_cat_var.get().strip()
-        if not name:
-            messagebox.showwarning("Validation", "Category name can't be empty.")
+        if self._busy():
+            return
+        try:
+            added = self.ledger.add_category(self.new_cat_var.get())
+        except ValueError as e:
+            messagebox.showwarning("Validation", str(e))
             return
-        if name in self.categories:
+        except Exception as e:
+            messagebox.showerror("Save Error", f"Failed to save data: {e}")
+            return
+        if not added:
             messagebox.showinfo("Info", "Category already exists.")
             return
-        self.categories.append(name)
-        self.category_combo['values'] = self.categories
-        self.filter_category_combo['values'] = ["All"] + self.categories
-        self.budget_category_combo['values'] = self.categories
+        name = self.ledger.categories[-1]
+        self._sync_category_widgets()
         self.category_combo.set(name)
         self.new_cat_var.set("")
-        self._save_data()
 
     def remove_selected_category(self):
+        if self._busy():
+            return
         cur = self.category_combo.get()
         if not cur:
             messagebox.showinfo("Info", "No category selected.")
             return
-        if cur in DEFAULT_CATEGORIES:
-            messagebox.showwarning("Protected", "Default categories cannot be removed.")
+        try:
+            removed = self.ledger.remove_category(cur)
+        except ValueError as e:
+            messagebox.showwarning("Protected", str(e))
             return
-        if cur in self.categories:
-            self.categories.remove(cur)
-            self.category_combo['values'] = self.categories
-            self.filter_category_combo['values'] = ["All"] + self.categories
-            self.budget_category_combo['values'] = self.categories
-            if self.categories:
-                self.category_combo.set(self.categories[0])
+        except Exception as e:
+            messagebox.showerror("Save Error", f"Failed to save data: {e}")
+            return
+        if removed:
+            self._sync_category_widgets()
+            if self.ledger.categories:
+                self.category_combo.set(self.ledger.categories[0])
             messagebox.showinfo("Removed", f"Category '{cur}' removed.")
-            self._save_data()
 
     # --- Data Load/Save ---
     def _load_data(self):
-        if os.path.exists(DATA_FILE):
-            try:
-                with open(DATA_FILE, 'r', encoding='utf-8') as f:
-                    payload = json.load(f)
-                self.transactions = payload.get('transactions', [])
-                file_cats = payload.get('categories')
-                if isinstance(file_cats, list):
-                    for c in file_cats:
-                        if c not in self.categories:
-                            self.categories.append(c)
-                    self.category_combo['values'] = self.categories
-                    self.filter_category_combo['values'] = ["All"] + self.categories
-                    self.budget_category_combo['values'] = self.categories
-                self.budget_limits = payload.get('budget_limits', {})
-            except Exception as e:
-                messagebox.showwarning("Load Error", f"Failed to load data file: {e}")
-                self.transactions = []
-        else:
-            self.transactions = []
-
+        # Parsing and building the store happen on the I/O worker
+        self._loading = True
+        self._load_started = time.perf_counter()
+        self.status_var.set("Loading...")
+        self._io.submit('load', lambda job: self.ledger.read(), on_done=self._apply_loaded, on_error=self._load_failed)
+
+    def _apply_loaded(self, result):
+        self.ledger.apply(result)
+        self._sync_category_widgets()
+        self._loading = False
+        self.status_var.set("")
+        self._time_startup('_load_data', self._load_started)
+        if PROFILER.enabled:
+            # submit to applied, worker read included
+            PROFILER.record("wallet._load_data", self._load_started, time.perf_counter() - self._load_started, 0)
+        self._refresh_ui()
+        if self._startup_timing is not None:
+            started = time.perf_counter()
+            self._refresh.flush()
+            self._time_startup('first _refresh_ui', started)
+            self._report_startup()
+
+    def _load_failed(self, e):
+        # keep the unreadable file: nothing may be saved or compacted over it
+        self._loading = False
+        self._load_error = e
+        self.status_var.set("Read-only: the data file could not be loaded")
+        if self._startup_timing is not None:
+            self._report_startup()
+        messagebox.showwarning("Load Error", f"Failed to load data file: {e}")
+
+    # --- Startup Timing ---
+    def _time_startup(self, phase, started):
+        if self._startup_timing is not None:
+            self._startup_timing[phase] = time.perf_counter() - started
+
+    def _report_startup(self):
+        # --startup-time: print where cold start went, then quit
+        timing, self._startup_timing = self._startup_timing, None
+        timing['total'] = time.perf_counter() - _IMPORT_START
+        for phase, seconds in timing.items():
+            print(f"{phase:<20}{seconds * 1000:9.1f} ms")
+        self.after_idle(self._on_close)
+
+    def _busy(self):
+        if self._load_error is not None:
+            messagebox.showwarning("Read Only", "The data file could not be loaded, so changes are disabled "
+                                                f"to keep it intact.\n\n{self._load_error}")
+            return True
+        if self._loading:
+            messagebox.showinfo("Please wait", "The wallet is still loading.")
+        return self._loading
+
+    @instrumented("wallet._save_data")
     def _save_data(self):
-        payload = {
-            'transactions': self.transactions, 
-            'categories': self.categories, 
-            'budget_limits': self.budget_limits,
-            'last_updated': datetime.now().isoformat()
-        }
+        # Snapshot mode: coalesced, the payload is built once when the write is dispatched
+        self._io.submit('save', lambda job, payload: self.ledger.write_snapshot(payload),
+                        prepare=self.ledger.snapshot_payload,
+                        on_error=lambda e: messagebox.showerror("Save Error", f"Failed to save data: {e}"))
+
+    def _on_close(self):
+        if self._perf_after is not None:
+            self.after_cancel(self._perf_after)
+        self._io.close()
+        self.ledger.close()
+        PROFILER.finish()
+        self.destroy()
+
+    # --- Performance ---
+    def _toggle_performance_tab(self, event=None):
+        # Showing the tab turns profiling on; hiding it leaves the numbers collecting
+        if self.perf_tab is not None:
+            if self._perf_after is not None:
+                self.after_cancel(self._perf_after)
+                self._perf_after = None
+            self.notebook.forget(self.perf_tab)
+            self.perf_tab.destroy()
+            self.perf_tab = None
+            return
+        PROFILER.enable()
+        self._build_performance_tab()
+        self.notebook.select(self.perf_tab)
+
+    def _update_performance_tab(self):
+        self._perf_after = self.after(PERF_REFRESH_MS, self._update_performance_tab)
+        if self.notebook.select() != str(self.perf_tab):
+            return
+        self.perf_tree.delete(*self.perf_tree.get_children())
+        calls = 0
+        for name, count, mean, p50, p95, longest, blocks in PROFILER.summary():
+            calls += count
+            self.perf_tree.insert('', tk.END, values=(name, count, f"{mean * 1000:.2f}", f"{p50 * 1000:.2f}",
+                                                      f"{p95 * 1000:.2f}", f"{longest * 1000:.2f}", f"{blocks:.0f}"))
+        self.perf_status_var.set(f"{calls} calls recorded")
+
+    def _reset_profile(self):
+        PROFILER.reset()
+        self.after_cancel(self._perf_after)
+        self._update_performance_tab()
+
+    def _save_trace(self):
+        path = filedialog.asksaveasfilename(defaultextension=".json", initialfile="wallet_trace.json",
+                                            filetypes=[("Chrome trace", "*.json")])
+        if not path:
+            return
         try:
-            with open(DATA_FILE, 'w', encoding='utf-8') as f:
-                json.dump(payload, f, ensure_ascii=False, indent=2)
-        except Exception as e:
-            messagebox.showerror("Save Error", f"Failed to save data: {e}")
+            count = PROFILER.dump_trace(path)
+        except OSError as e:
+            messagebox.showerror("Trace Error", f"Failed to write trace: {e}")
+            return
+        messagebox.showinfo("Trace Saved", f"Wrote {count} events to {path}\nOpen it in chrome://tracing or ui.perfetto.dev.")
 
     # --- Filter Functions ---
     def clear_filters(self):
@@ -332,115 +544,195 @@ class PersonalWalletAdvancedApp(tk.Tk):
         self.filter_category_var.set("All")
         self.filter_type_var.set("All")
         self.month_var.set(self.current_month_filter)
-        self._refresh_ui()
+        self._refresh.mark('table', delay=0)
+
+    def _filter_args(self):
+        return (self.search_var.get(), self.filter_category_var.get(),
+                self.filter_type_var.get(), self.month_var.get())
 
+    @instrumented("wallet._filter_transactions")
     def _filter_transactions(self):
-        filtered = self.transactions.copy()
-        
-        # Search filter
-        search_term = self.search_var.get().lower()
-        if search_term:
-            filtered = [tx for tx in filtered if 
-                       search_term in tx.get('description', '').lower() or 
-                       search_term in tx.get('category', '').lower()]
-        
-        # Category filter
-        category_filter = self.filter_category_var.get()
-        if category_filter != "All":
-            filtered = [tx for tx in filtered if tx.get('category') == category_filter]
-        
-        # Type filter
-        type_filter = self.filter_type_var.get()
-        if type_filter != "All":
-            filtered = [tx for tx in filtered if tx.get('type') == type_filter]
-        
-        # Month filter
-        month_filter = self.month_var.get()
-        if month_filter:
-            filtered = [tx for tx in filtered if tx.get('date', '').startswith(month_filter)]
-        
-        return filtered
+        return self.ledger.filter_transactions(*self._filter_args(), sort=self._sort_column,
+                                               descending=self._sort_descending)
+
+    @instrumented("wallet._filter_indices")
+    def _filter_indices(self):
+        # sets the view's recurring occurrences alongside the returned keys
+        keys, self._view_extra = self.ledger.view_keys(*self._filter_args(), sort=self._sort_column)
+        return keys
+
+    def _sort_by(self, column):
+        # Heading click: sort by that column, a second click flips the direction.
+        # The ledger keeps each column's order up to date, so a new column is one
+        # pass over the filtered keys and a flip only redraws the visible window
+        flip = column == self._sort_column
+        if flip:
+            self._sort_descending = not self._sort_descending
+        else:
+            self._sort_column, self._sort_descending = column, False
+        for c in self.tree['columns']:
+            arrow = (" ▼" if self._sort_descending else " ▲") if c == self._sort_column else ""
+            self.tree.heading(c, text=c.capitalize() + arrow)
+        if not VIRTUAL_LIST:
+            self._refresh_table()
+            return
+        if not flip:
+            self._view_index = self._filter_indices()
+        self._tree_offset = 0
+        self._render_tree_window()
+
+    # --- Virtual Transaction List ---
+    def _tx_values(self, tx):
+        return (RECURRING_MARK if tx.id is None else tx.id, tx.date, tx.type, tx.category, f"{tx.amount:.2f}", tx.description)
+
+    def _view_row(self, key):
+        return self._view_extra[-1 - key] if key < 0 else self.ledger.transactions[key]
+
+    def _render_tree_window(self):
+        # Reuse a fixed pool of Treeview items and rewrite their values for the current window
+        total = len(self._view_index)
+        self._tree_offset = max(0, min(self._tree_offset, total - self._tree_rows))
+        start, stop = self._tree_offset, self._tree_offset + self._tree_rows + TREE_BUFFER_ROWS
+        if self._sort_descending:
+            # read the ascending index from its end rather than reversing it
+            window = self._view_index[max(0, total - stop):total - start][::-1]
+        else:
+            window = self._view_index[start:stop]
+        items = self.tree.get_children()
+        if len(items) > len(window):
+            self.tree.delete(*items[len(window):])
+        selected = []
+        rows = [self._view_row(i) for i in window]
+        for pos, tx in enumerate(rows):
+            if pos < len(items):
+                iid = items[pos]
+                self.tree.item(iid, values=self._tx_values(tx))
+            else:
+                iid = self.tree.insert('', tk.END, values=self._tx_values(tx))
+            if tx.id in self._selected_ids:
+                selected.append(iid)
+        self._window_ids = {tx.id for tx in rows if tx.id is not None}
+        self.tree.selection_set(selected)
+        self.tree.yview_moveto(0)
+
+        if total:
+            self.tree_scrollbar.set(self._tree_offset / total, min(1.0, (self._tree_offset + self._tree_rows) / total))
+        else:
+            self.tree_scrollbar.set(0, 1)
+
+    def _scroll_tree(self, amount, what):
+        step = self._tree_rows if what == 'pages' else 1
+        self._tree_offset += int(amount) * step
+        self._render_tree_window()
+        return "break"
+
+    def _on_tree_scroll(self, action, amount, what=None):
+        if action == 'moveto':
+            self._tree_offset = int(float(amount) * len(self._view_index))
+            self._render_tree_window()
+        else:
+            self._scroll_tree(amount, what)
+
+    def _on_tree_resize(self, event):
+        row_height = int(ttk.Style(self).lookup('Treeview', 'rowheight') or 20)
+        rows = max(1, (event.height - row_height) // row_height)
+        if rows != self._tree_rows:
+            self._tree_rows = rows
+            self._render_tree_window()
+
+    def _on_tree_select(self, event=None):
+        # Selection follows transaction ids so it survives scrolling the window
+        # recurring occurrences have no id; they go with their rule
+        values = (self.tree.item(s)['values'][0] for s in self.tree.selection())
+        visible = {int(v) for v in values if str(v).isdigit()}
+        self._selected_ids = (self._selected_ids - self._window_ids) | visible
 
     # --- UI Refresh ---
-    def _refresh_ui(self):
-        # Refresh transactions tree
-        for i in self.tree.get_children():
-            self.tree.delete(i)
-        
-        filtered_transactions = self._filter_transactions()
-        for tx in filtered_transactions:
-            self.tree.insert('', tk.END, values=(
-                tx['id'], tx['date'], tx['type'], tx['category'], 
-                f"{tx['amount']:.2f}", tx.get('description','')
-            ))
+    def _refresh_ui(self, *args):
+        # Data changed: every view is dirty, rebuilt once on the next idle turn
+        self._refresh.mark(delay=0)
+
+    def _refresh_table(self):
+        if VIRTUAL_LIST:
+            self._view_index = self._filter_indices()
+            self._selected_ids = set()
+            self._tree_offset = 0
+            self._render_tree_window()
+        else:
+            for i in self.tree.get_children():
+                self.tree.delete(i)
+            for tx in self._filter_transactions():
+                self.tree.insert('', tk.END, values=self._tx_values(tx))
 
+    def _refresh_stats(self):
         # Calculate and display balance and statistics
-        total_income = sum(float(tx['amount']) for tx in self.transactions if tx['type'] == 'Income')
-        total_expenses = sum(float(tx['amount']) for tx in self.transactions if tx['type'] == 'Expense')
-        balance = total_income - total_expenses
+        o = self.ledger.overview()
+        balance = o['balance']
         
         color = "#2E8B57" if balance >= 0 else "#B22222"
         self.balance_var.set(f"Balance: {balance:.2f}")
         self.balance_label.configure(fg=color)
-        self.stats_var.set(f"Income: {total_income:.2f} | Expenses: {total_expenses:.2f}")
+        self.stats_var.set(f"Income: {o['total_income']:.2f} | Expenses: {o['total_expenses']:.2f}")
 
-        # Refresh analytics
-        self._update_analytics()
-        
-        # Refresh budget
-        self._update_budget_display()
+        self._update_analytics(o)
 
-    def _update_analytics(self):
+    def _update_analytics(self, o=None):
         # Update statistics text
         self.stats_text.delete(1.0, tk.END)
-        
-        current_month = datetime.now().strftime("%Y-%m")
-        month_income = sum(float(tx['amount']) for tx in self.transactions 
-                          if tx['type'] == 'Income' and tx['date'].startswith(current_month))
-        month_expenses = sum(float(tx['amount']) for tx in self.transactions 
-                            if tx['type'] == 'Expense' and tx['date'].startswith(current_month))
+        o = o or self.ledger.overview()
         
         stats_text = f"""
 Financial Overview:
 -------------------
-Total Balance: {sum(float(tx['amount']) if tx['type']=='Income' else -float(tx['amount']) for tx in self.transactions):.2f}
-Total Income: {sum(float(tx['amount']) for tx in self.transactions if tx['type'] == 'Income'):.2f}
-Total Expenses: {sum(float(tx['amount']) for tx in self.transactions if tx['type'] == 'Expense'):.2f}
+Total Balance: {o['net_balance']:.2f}
+Total Income: {o['total_income']:.2f}
+Total Expenses: {o['total_expenses']:.2f}
 
-Current Month ({current_month}):
+Current Month ({o['month']}):
 -------------------------------
-Monthly Income: {month_income:.2f}
-Monthly Expenses: {month_expenses:.2f}
-Monthly Savings: {month_income - month_expenses:.2f}
+Monthly Income: {o['month_income']:.2f}
+Monthly Expenses: {o['month_expenses']:.2f}
+Monthly Savings: {o['month_income'] - o['month_expenses']:.2f}
 
 Transaction Count:
 ------------------
-Total Transactions: {len(self.transactions)}
-Income Transactions: {len([tx for tx in self.transactions if tx['type'] == 'Income'])}
-Expense Transactions: {len([tx for tx in self.transactions if tx['type'] == 'Expense'])}
+Total Transactions: {o['count']}
+Income Transactions: {o['income_count']}
+Expense Transactions: {o['expense_count']}
 """
         self.stats_text.insert(1.0, stats_text)
 
-        # Update pie chart
+    @instrumented("wallet._update_charts")
+    def _update_charts(self):
+        # Charts are drawn only while the Analytics tab is showing and only if
+        # the aggregates moved since the last draw; opening the tab catches up
+        if self.notebook.select() != str(self.tab2):
+            return
+        if self.pie_canvas is None:
+            self._build_charts()
+        if self._charts_version == self.ledger.aggregates.version:
+            return
+        self._charts_version = self.ledger.aggregates.version
         self._update_pie_chart()
-        
-        # Update trend chart
         self._update_trend_chart()
 
     def _update_pie_chart(self):
+        # Get expense data by category
+        expense_data = self.ledger.aggregates.category_totals('Expense')
+        categories = list(expense_data.keys())
+        amounts = list(expense_data.values())
+
+        # Same categories as the last draw: move the existing wedges and blit them
+        if expense_data and categories == self._pie_categories:
+            update_pie(*self._pie_artists, amounts, startangle=90)
+            self._pie_blitter.update()
+            return
+        self._pie_categories = categories
+
         self.pie_figure.clear()
         ax = self.pie_figure.add_subplot(111)
         
-        # Get expense data by category
-        expense_data = defaultdict(float)
-        for tx in self.transactions:
-            if tx['type'] == 'Expense':
-                expense_data[tx['category']] += float(tx['amount'])
-        
         if expense_data:
-            categories = list(expense_data.keys())
-            amounts = list(expense_data.values())
-            
             # Create pie chart
             wedges, texts, autotexts = ax.pie(amounts, labels=categories, autopct='%1.1f%%', startangle=90)
             ax.set_title('Expense Distribution by Category')
@@ -449,36 +741,40 @@ Expense Transactions: {len([tx for tx in self.transactions if tx['type'] == 'Exp
             for autotext in autotexts:
                 autotext.set_color('white')
                 autotext.set_fontweight('bold')
+            self._pie_artists = (wedges, texts, autotexts)
+            self._pie_blitter.set_artists(wedges + texts + autotexts)
         else:
             ax.text(0.5, 0.5, 'No expense data\navailable', ha='center', va='center', transform=ax.transAxes)
             ax.set_title('Expense Distribution by Category')
+            self._pie_blitter.set_artists([])
         
         self.pie_canvas.draw()
 
     def _update_trend_chart(self):
-        self.trend_figure.clear()
-        ax = self.trend_figure.add_subplot(111)
-        
         # Group by month
-        monthly_data = defaultdict(lambda: {'income': 0, 'expenses': 0})
-        for tx in self.transactions:
-            month = tx['date'][:7]  # YYYY-MM
-            amount = float(tx['amount'])
-            if tx['type'] == 'Income':
-                monthly_data[month]['income'] += amount
-            else:
-                monthly_data[month]['expenses'] += amount
+        monthly_data = self.ledger.aggregates.monthly_income_expenses()
+        months = sorted(monthly_data.keys())
+        income = [monthly_data[month]['income'] for month in months]
+        expenses = [monthly_data[month]['expenses'] for month in months]
+
+        # Same months and still inside the y-range: only the bar heights change
+        if (monthly_data and months == self._trend_months
+                and max(income + expenses) <= self._trend_ax.get_ylim()[1]):
+            for bar, height in zip(self._trend_bars, income + expenses):
+                bar.set_height(height)
+            self._trend_blitter.update()
+            return
+        self._trend_months = months
+
+        self.trend_figure.clear()
+        ax = self._trend_ax = self.trend_figure.add_subplot(111)
         
         if monthly_data:
-            months = sorted(monthly_data.keys())
-            income = [monthly_data[month]['income'] for month in months]
-            expenses = [monthly_data[month]['expenses'] for month in months]
-            
             x = range(len(months))
             width = 0.35
             
-            ax.bar([i - width/2 for i in x], income, width, label='Income', color='#2E8B57')
-            ax.bar([i + width/2 for i in x], expenses, width, label='Expenses', color='#B22222')
+            income_bars = ax.bar([i - width/2 for i in x], income, width, label='Income', color='#2E8B57')
+            expense_bars = ax.bar([i + width/2 for i in x], expenses, width, label='Expenses', color='#B22222')
             
             ax.set_xlabel('Month')
             ax.set_ylabel('Amount')
@@ -486,9 +782,12 @@ Expense Transactions: {len([tx for tx in self.transactions if tx['type'] == 'Exp
             ax.set_xticks(x)
             ax.set_xticklabels(months, rotation=45)
             ax.legend()
+            self._trend_bars = list(income_bars) + list(expense_bars)
         else:
             ax.text(0.5, 0.5, 'No data available', ha='center', va='center', transform=ax.transAxes)
             ax.set_title('Monthly Income vs Expenses')
+            self._trend_bars = []
+        self._trend_blitter.set_artists(self._trend_bars)
         
         self.trend_figure.tight_layout()
         self.trend_canvas.draw()
@@ -501,178 +800,230 @@ Expense Transactions: {len([tx for tx in self.transactions if tx['type'] == 'Exp
         # Clear alerts
         self.alerts_text.delete(1.0, tk.END)
         
-        current_month = datetime.now().strftime("%Y-%m")
-        alerts = []
-        
-        for category, budget_limit in self.budget_limits.items():
-            # Calculate spent this month
-            spent = sum(float(tx['amount']) for tx in self.transactions 
-                       if tx['category'] == category and tx['type'] == 'Expense' 
-                       and tx['date'].startswith(current_month))
-            
-            remaining = float(budget_limit) - spent
-            status = "Within Budget" if remaining >= 0 else "Over Budget"
-            
-            # Add to treeview
+        self.budget_month_combo['values'] = self.ledger.budget_months()
+        rows, alerts = self.ledger.budget_status(self.budget_month_var.get())
+        for category, budget_limit, spent, remaining, status, projected in rows:
             self.budget_tree.insert('', tk.END, values=(
-                category, f"{float(budget_limit):.2f}", f"{spent:.2f}", 
+                category, f"{budget_limit:.2f}", f"{spent:.2f}", f"{projected:.2f}",
                 f"{remaining:.2f}", status
             ))
-            
-            # Generate alerts
-            if remaining < 0:
-                alerts.append(f"⚠️ OVER BUDGET: {category} exceeded by {-remaining:.2f}")
-            elif remaining < float(budget_limit) * 0.2:  # Less than 20% remaining
-                alerts.append(f"🔔 WARNING: {category} has only {remaining:.2f} remaining")
-        
-        if not alerts:
-            alerts.append("✅ All budgets are within limits")
         
         self.alerts_text.insert(1.0, "\n".join(alerts))
 
-    # --- Transaction Functions ---
-    def _next_id(self):
-        if not self.transactions:
-            return 1
-        return max(tx['id'] for tx in self.transactions) + 1
+        for i in self.recurring_tree.get_children():
+            self.recurring_tree.delete(i)
+        for rule in self.ledger.recurring.values():
+            self.recurring_tree.insert('', tk.END, values=(
+                rule.id, rule.type, rule.category, f"{rule.cents / 100:.2f}", rule.description,
+                rule.describe(), rule.start, rule.end or ""
+            ))
 
+    # --- Transaction Functions ---
     def add_transaction(self):
-        amt_str = self.amount_var.get().strip()
-        if not amt_str:
-            messagebox.showwarning("Validation", "Amount is required.")
+        if self._busy():
             return
+        repeat = REPEAT_CHOICES[self.repeat_var.get()]
         try:
-            amt = float(amt_str)
-            if amt <= 0: raise ValueError
-        except:
-            messagebox.showwarning("Validation", "Please enter a valid positive number for amount.")
-            return
-        tx_type = self.type_var.get()
-        category = self.category_var.get() or 'Other'
-        desc = self.desc_var.get().strip()
-        date_str = self.date_var.get().strip()
-        try:
-            datetime.strptime(date_str, "%Y-%m-%d")
-        except:
-            messagebox.showwarning("Validation", "Date must be in YYYY-MM-DD format.")
-            return
-        tx = {'id': self._next_id(), 'date': date_str, 'type': tx_type, 'category': category,
-              'amount': round(amt,2), 'description': desc}
-        self.transactions.append(tx)
-        self._save_data()
+            if repeat:
+                # occurrences are generated from the rule, starting on the date given
+                frequency, interval = repeat
+                self.ledger.add_recurring(self.amount_var.get(), self.type_var.get(), self.category_var.get(),
+                                          self.desc_var.get(), self.date_var.get(), frequency, interval)
+            else:
+                self.ledger.add_transaction(self.amount_var.get(), self.type_var.get(), self.category_var.get(),
+                                            self.desc_var.get(), self.date_var.get())
+        except ValueError as e:
+            messagebox.showwarning("Validation", str(e))
+            return
+        except Exception as e:
+            messagebox.showerror("Save Error", f"Failed to save data: {e}")
         self._refresh_ui()
         self.amount_var.set("")
         self.desc_var.set("")
         self.date_var.set(datetime.now().strftime("%Y-%m-%d"))
+        self.repeat_var.set("Once")
+
+    def remove_selected_recurring(self):
+        if self._busy():
+            return
+        rule_ids = [int(self.recurring_tree.item(s)['values'][0]) for s in self.recurring_tree.selection()]
+        if not rule_ids:
+            messagebox.showinfo("Info", "No recurring transaction selected.")
+            return
+        if not messagebox.askyesno("Confirm", "Stop the selected recurring transaction(s)?\n"
+                                              "Their past occurrences are removed as well."):
+            return
+        try:
+            for rule_id in rule_ids:
+                self.ledger.remove_recurring(rule_id)
+        except Exception as e:
+            messagebox.showerror("Save Error", f"Failed to save data: {e}")
+        self._refresh_ui()
 
     def delete_selected(self):
-        sel = self.tree.selection()
-        if not sel: 
+        if self._busy():
+            return
+        if VIRTUAL_LIST:
+            ids_to_delete = list(self._selected_ids)
+        else:
+            # recurring occurrences have no id; they go with their rule
+            ids_to_delete = [int(v) for v in (self.tree.item(s)['values'][0] for s in self.tree.selection())
+                             if str(v).isdigit()]
+        if not ids_to_delete: 
             messagebox.showinfo("Info", "No transaction selected.")
             return
         if not messagebox.askyesno("Confirm", "Delete selected transaction(s)?"): 
             return
-        ids_to_delete = [int(self.tree.item(s)['values'][0]) for s in sel]
-        self.transactions = [tx for tx in self.transactions if tx['id'] not in ids_to_delete]
-        self._save_data()
+        try:
+            self.ledger.delete(ids_to_delete)
+        except Exception as e:
+            messagebox.showerror("Save Error", f"Failed to save data: {e}")
         self._refresh_ui()
 
     # --- Budget Functions ---
     def set_budget(self):
-        category = self.budget_category_var.get()
-        if not category:
-            messagebox.showwarning("Validation", "Please select a category.")
-            return
-        
-        amount_str = self.budget_amount_var.get().strip()
-        if not amount_str:
-            messagebox.showwarning("Validation", "Please enter a budget amount.")
+        if self._busy():
             return
-        
+        category = self.budget_category_var.get()
+        month = self.budget_month_var.get()
         try:
-            amount = float(amount_str)
-            if amount <= 0: raise ValueError
-        except:
-            messagebox.showwarning("Validation", "Please enter a valid positive number for budget.")
+            amount = self.ledger.set_budget(category, self.budget_amount_var.get(), month)
+        except ValueError as e:
+            messagebox.showwarning("Validation", str(e))
             return
-        
-        self.budget_limits[category] = amount
-        self._save_data()
-        self._update_budget_display()
+        except Exception as e:
+            messagebox.showerror("Save Error", f"Failed to save data: {e}")
+            return
+        self._refresh.mark('budget', delay=0)
         self.budget_amount_var.set("")
-        messagebox.showinfo("Success", f"Budget for {category} set to {amount:.2f}")
+        messagebox.showinfo("Success", f"Budget for {category} set to {amount:.2f} from {month}")
 
     # --- Export/Import Functions ---
     def export_csv(self):
+        filtered = messagebox.askyesnocancel("Export", "Export only the transactions in the current view?\n"
+                                                       "Choose No to export all transactions.")
+        if filtered is None:
+            return
         path = filedialog.asksaveasfilename(defaultextension='.csv', 
-                                          filetypes=[('CSV files','*.csv')], 
+                                          filetypes=[('CSV files','*.csv'), ('Gzipped CSV','*.csv.gz')], 
                                           title='Export transactions to CSV')
         if not path: 
             return
         
-        try:
-            with open(path, 'w', newline='', encoding='utf-8') as f:
-                writer = csv.writer(f)
-                writer.writerow(['ID', 'Date', 'Type', 'Category', 'Amount', 'Description'])
-                for tx in self.transactions:
-                    writer.writerow([
-                        tx['id'], tx['date'], tx['type'], tx['category'],
-                        f"{tx['amount']:.2f}", tx.get('description', '')
-                    ])
-            messagebox.showinfo("Exported", f"Data exported to {path}")
-        except Exception as e:
-            messagebox.showerror("Export Error", f"Failed to export: {e}")
+        # The rows are copied when the job starts; formatting and writing happen on the worker
+        filters = self._filter_args() if filtered else ()
+        # keyed by target file: exports to other files run alongside, a new export
+        # to the same file supersedes the running one
+        self.status_var.set("Exporting...")
+        self._exports.add(path)
+        self._io.submit(('export', os.path.abspath(path)),
+                        lambda job, rows: self.ledger.write_csv(path, rows, job.cancelled),
+                        prepare=lambda: self.ledger.export_snapshot(*filters),
+                        on_done=lambda count: self._export_finished(path, count),
+                        on_error=lambda e: self._export_failed(path, e))
+
+    def _export_finished(self, path, count):
+        self._exports.discard(path)
+        if not self._exports:
+            self.status_var.set("")
+        messagebox.showinfo("Exported", f"Exported {count} transactions to {path}")
+
+    def _export_failed(self, path, e):
+        self._exports.discard(path)
+        if not self._exports:
+            self.status_var.set("")
+        messagebox.showerror("Export Error", f"Failed to export {path}: {e}")
 
     def import_json(self):
+        if self._busy():
+            return
+        if self._io.busy('import'):
+            messagebox.showinfo("Import", "An import is already running.")
+            return
         path = filedialog.askopenfilename(filetypes=[('JSON files','*.json'),('All Files','*.*')], 
                                         title='Import transactions')
         if not path: 
             return
         
+        # Parsed and validated on the I/O worker; batches are committed here as they arrive
+        self._import_name = os.path.basename(path)
+        self._imported_count = 0
+        self._io.submit('import', self._read_import, path, on_progress=self._commit_import,
+                        on_done=self._import_finished, on_error=self._import_failed)
+
+    def _read_import(self, job, path):
+        extras = {}
+        for batch in self.ledger.iter_import(path, extras):
+            job.emit(batch)
+            if job.cancelled():
+                break
+        return extras
+
+    def _commit_import(self, progress):
+        batch, fraction = progress
         try:
-            with open(path, 'r', encoding='utf-8') as f: 
-                payload = json.load(f)
-            imported = payload.get('transactions', [])
-            if not isinstance(imported, list): 
-                raise ValueError('Invalid format')
-            
-            next_id = self._next_id()
-            for tx in imported:
-                try: 
-                    amt = float(tx.get('amount', 0))
-                except: 
-                    amt = 0.0
-                new_tx = {
-                    'id': next_id, 
-                    'date': tx.get('date', datetime.now().strftime('%Y-%m-%d')),
-                    'type': tx.get('type','Expense'), 
-                    'category': tx.get('category','Other'),
-                    'amount': round(amt,2), 
-                    'description': tx.get('description','')
-                }
-                self.transactions.append(new_tx)
-                next_id += 1
-            
-            file_cats = payload.get('categories')
-            if isinstance(file_cats, list):
-                for c in file_cats:
-                    if c not in self.categories: 
-                        self.categories.append(c)
-                self.category_combo['values'] = self.categories
-                self.filter_category_combo['values'] = ["All"] + self.categories
-                self.budget_category_combo['values'] = self.categories
-            
-            # Import budgets if available
-            file_budgets = payload.get('budget_limits', {})
-            if file_budgets:
-                self.budget_limits.update(file_budgets)
-            
-            self._save_data()
-            self._refresh_ui()
-            messagebox.showinfo("Imported", f"Imported {len(imported)} transactions from {os.path.basename(path)}")
+            self._imported_count += self.ledger.commit_import(batch)
+        except Exception as e:
+            messagebox.showerror("Save Error", f"Failed to save data: {e}")
+        self.status_var.set(f"Importing {self._import_name}: {self._imported_count:,} transactions ({fraction:.0%})")
+
+    def _import_finished(self, extras):
+        try:
+            if self.ledger.finish_import(extras):
+                self._sync_category_widgets()
         except Exception as e:
-            messagebox.showerror("Import Error", f"Failed to import: {e}")
+            messagebox.showerror("Save Error", f"Failed to save data: {e}")
+        self.status_var.set("")
+        self._refresh_ui()
+        messagebox.showinfo("Imported", f"Imported {self._imported_count} transactions from {self._import_name}")
+
+    def _import_failed(self, e):
+        self.status_var.set("")
+        self._refresh_ui()
+        messagebox.showerror("Import Error", f"Failed to import after {self._imported_count} transactions: {e}")
+
+    def import_statement(self):
+        if self._busy():
+            return
+        if self._io.busy('import'):
+            messagebox.showinfo("Import", "An import is already running.")
+            return
+        path = filedialog.askopenfilename(filetypes=[('Bank statements','*.csv *.ofx *.qfx'),('All Files','*.*')],
+                                        title='Import bank statement')
+        if not path:
+            return
+        try:
+            mapping = self.ledger.statement_mapping()
+        except Exception as e:
+            messagebox.showerror("Import Error", f"Failed to read the column mapping: {e}")
+            return
+
+        # Parsing and dedup run on the I/O worker (and its process pool); the
+        # new rows are merged here in one batch
+        self._import_name = os.path.basename(path)
+        self.status_var.set(f"Importing {self._import_name}...")
+        self._io.submit('import', lambda job, snapshot: self.ledger.read_statement(path, snapshot, mapping, job.cancelled),
+                        prepare=self.ledger.export_snapshot,
+                        on_done=self._statement_parsed, on_error=self._statement_failed)
+
+    def _statement_parsed(self, result):
+        fresh, skipped, errors = result
+        try:
+            added = self.ledger.commit_statement(fresh)
+        except Exception as e:
+            added = len(fresh)
+            messagebox.showerror("Save Error", f"Failed to save data: {e}")
+        self._sync_category_widgets()
+        self.status_var.set("")
+        self._refresh_ui()
+        messagebox.showinfo("Imported", f"Imported {added} transactions from {self._import_name}\n"
+                                        f"{skipped} already in the wallet, {errors} rows could not be read")
+
+    def _statement_failed(self, e):
+        self.status_var.set("")
+        messagebox.showerror("Import Error", f"Failed to import {self._import_name}: {e}")
 
 if __name__ == '__main__':
-    app = PersonalWalletAdvancedApp()
+    enable_from(sys.argv)
+    app = PersonalWalletAdvancedApp(startup_timing='--startup-time' in sys.argv)
     app.mainloop()
\ No newline at end of file
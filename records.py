@@ -0,0 +1,61 @@
+import sys
+from collections import namedtuple
+
+# Compact in-memory records. The JSON files keep the plain dict layout; these
+# convert at the boundary with from_dict()/to_dict().
+
+
+def to_cents(amount):
+    return round(float(amount) * 100)
+
+
+class Transaction(namedtuple('Transaction', 'id date type category cents description')):
+    # amount is held in cents (minor units), so totals are exact integer sums
+    __slots__ = ()
+
+    @property
+    def amount(self):
+        return self.cents / 100
+
+    @classmethod
+    def create(cls, tx_id, date, tx_type, category, amount, description=''):
+        # dates, types and categories repeat across millions of rows; share one string each
+        return cls(tx_id, sys.intern(date), sys.intern(tx_type), sys.intern(category),
+                   to_cents(amount), description or '')
+
+    @classmethod
+    def from_dict(cls, d):
+        return cls.create(d['id'], d['date'], d['type'], d['category'], d['amount'], d.get('description', ''))
+
+    def to_dict(self):
+        return {'id': self.id, 'date': self.date, 'type': self.type, 'category': self.category,
+                'amount': self.amount, 'description': self.description}
+
+
+def transaction_hook(d):
+    # json object_hook: rows become Transactions as they are parsed, so a large
+    # file never holds all of its dicts at once
+    if 'id' in d and 'amount' in d and 'date' in d:
+        return Transaction.from_dict(d)
+    return d
+
+
+class Task:
+    __slots__ = ('id', 'task', 'category', 'priority', 'created', 'done')
+
+    def __init__(self, task_id, task, category, priority, created, done=False):
+        self.id = task_id
+        self.task = task
+        self.category = sys.intern(category)
+        self.priority = sys.intern(priority)
+        self.created = created
+        self.done = done
+
+    @classmethod
+    def from_dict(cls, d):
+        return cls(d['id'], d['task'], d.get('category', 'General'), d.get('priority', 'Medium'),
+                   d.get('created', ''), d.get('done', False))
+
+    def to_dict(self):
+        return {'id': self.id, 'task': self.task, 'category': self.category, 'priority': self.priority,
+                'created': self.created, 'done': self.done}
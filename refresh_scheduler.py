@@ -0,0 +1,37 @@
+from instrumentation import PROFILER
+
+REFRESH_DELAY_MS = 200  # quiet period before a burst of change events is rebuilt
+
+
+class RefreshScheduler:
+    # Collects dirty view names and rebuilds each of them once per burst via after()
+    def __init__(self, widget, views, delay_ms=REFRESH_DELAY_MS, name=None):
+        self.widget = widget
+        self.name = name  # profiler span for a whole flush and, as name.view, each rebuild
+        self.views = views  # name -> rebuild callback, run in this order
+        self.delay_ms = delay_ms
+        self.dirty = set()
+        self._after_id = None
+
+    def mark(self, *names, delay=None):
+        # No names means every view; delay=0 flushes on the next idle turn
+        self.dirty.update(names or self.views)
+        if self._after_id is not None:
+            self.widget.after_cancel(self._after_id)
+        self._after_id = self.widget.after(self.delay_ms if delay is None else delay, self.flush)
+
+    def flush(self):
+        if self._after_id is not None:
+            self.widget.after_cancel(self._after_id)
+            self._after_id = None
+        dirty, self.dirty = self.dirty, set()
+        if self.name is None or not PROFILER.enabled:
+            for name, callback in self.views.items():
+                if name in dirty:
+                    callback()
+            return
+        with PROFILER.span(self.name):
+            for name, callback in self.views.items():
+                if name in dirty:
+                    with PROFILER.span(f"{self.name}.{name}"):
+                        callback()
@@ -0,0 +1,51 @@
+import json
+
+from records import Transaction
+from wallet_columns import TransactionColumns
+from wallet_core import WalletLedger
+
+DATES = ['2023-01-10', '2024-04-30', '2024-05-01', '2024-05-31', '2024-06-01',
+         '2024-05-32', '2024-05-01 10:30', '05/01/2024']
+
+
+def store(dates=DATES):
+    return TransactionColumns(Transaction(i, d, 'Expense', 'Other', 100, '') for i, d in enumerate(dates, 1))
+
+
+def month_dates(columns, month):
+    return sorted(columns[i].date for i in columns.filter_indices(month=month))
+
+
+def test_month_filter_matches_the_prefix_exactly():
+    columns = store()
+    assert month_dates(columns, '2024-05') == ['2024-05-01', '2024-05-01 10:30', '2024-05-31', '2024-05-32']
+    assert month_dates(columns, '2024') == ['2024-04-30', '2024-05-01', '2024-05-01 10:30', '2024-05-31',
+                                            '2024-05-32', '2024-06-01']
+    assert month_dates(columns, '05/') == ['05/01/2024']
+    assert month_dates(columns, '2025-01') == []
+
+
+def test_month_filter_agrees_with_startswith_after_deletes():
+    columns = store()
+    columns.remove_ids([3, 6])
+    for month in ('2024-05', '2024', '2023-01', '05/'):
+        expected = sorted(tx.date for tx in columns if tx.date.startswith(month))
+        assert month_dates(columns, month) == expected, month
+
+
+def test_unparsed_dates_sort_before_real_ones():
+    columns = store()
+    order = [columns[i].date for i in columns.filter_indices(sort='date')]
+    real = [d for d in order if len(d) == 10 and d[4] == '-' and d[:4].isdigit() and d != '2024-05-32']
+    assert order[-len(real):] == sorted(real)
+
+
+def test_ledger_loads_rows_with_unparsed_dates(tmp_path):
+    path = tmp_path / 'wallet.json'
+    rows = [{'id': 1, 'date': '05/01/2024', 'type': 'Expense', 'category': 'Other', 'amount': 5},
+            {'id': 2, 'date': '2024-05-02', 'type': 'Expense', 'category': 'Other', 'amount': 3}]
+    path.write_text(json.dumps({'transactions': rows, 'categories': ['Other']}), encoding='utf-8')
+    ledger = WalletLedger('journal', str(path)).load()
+    assert [tx.date for tx in ledger.transactions] == ['05/01/2024', '2024-05-02']
+    assert [tx.id for tx in ledger.filter_transactions(month='2024-05')] == [2]
+    ledger.close()
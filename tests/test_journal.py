@@ -0,0 +1,70 @@
+import json
+
+import pytest
+
+from wallet_core import WalletLedger
+from wallet_journal import TransactionJournal
+
+
+def open_ledger(tmp_path, compact_every=None):
+    ledger = WalletLedger('journal', str(tmp_path / 'wallet.json')).load()
+    if compact_every is not None:
+        ledger.storage.compact_every = compact_every
+    return ledger
+
+
+def add(ledger, amount, day='2026-05-01', description=''):
+    return ledger.add_transaction(str(amount), 'Expense', 'Other', description, day)
+
+
+def test_changes_replay_from_the_journal(tmp_path):
+    ledger = open_ledger(tmp_path)
+    first = add(ledger, 5, description='coffee')
+    second = add(ledger, 7)
+    ledger.delete([first.id])
+    ledger.set_budget('Other', '100', '2026-05')
+    ledger.close()
+    assert not (tmp_path / 'wallet.json').exists()
+
+    reloaded = open_ledger(tmp_path)
+    assert [tx.id for tx in reloaded.transactions] == [second.id]
+    assert reloaded.budget_for('2026-05')['Other'] == 100.0
+    assert reloaded.overview()['count'] == 1
+    reloaded.close()
+
+
+def test_compaction_keeps_later_records_and_ids(tmp_path):
+    ledger = open_ledger(tmp_path, compact_every=5)
+    added = [add(ledger, i + 1) for i in range(12)]
+    ledger.delete([added[-1].id])
+    ledger.close()
+
+    snapshot = json.loads((tmp_path / 'wallet.json').read_text(encoding='utf-8'))
+    assert snapshot['journal_seq'] > 0
+    reloaded = open_ledger(tmp_path)
+    assert sorted(tx.id for tx in reloaded.transactions) == [tx.id for tx in added[:-1]]
+    # the deleted newest id is not handed out again
+    assert add(reloaded, 1).id == added[-1].id + 1
+    reloaded.close()
+
+
+def test_torn_journal_tail_is_ignored(tmp_path):
+    ledger = open_ledger(tmp_path)
+    kept = add(ledger, 3)
+    ledger.close()
+    with open(tmp_path / 'wallet.journal', 'a', encoding='utf-8') as f:
+        f.write('{"seq": 99, "op": "add", "da')
+    state = TransactionJournal(str(tmp_path / 'wallet.json')).load()
+    assert [tx.id for tx in state['transactions']] == [kept.id]
+
+
+def test_compaction_error_is_reported_after_the_change_is_written(tmp_path):
+    ledger = open_ledger(tmp_path)
+    ledger.storage.error = OSError('disk full')
+    with pytest.raises(OSError):
+        add(ledger, 9, description='kept')
+    ledger.close()
+
+    reloaded = open_ledger(tmp_path)
+    assert [tx.description for tx in reloaded.transactions] == ['kept']
+    reloaded.close()
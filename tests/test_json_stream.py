@@ -0,0 +1,61 @@
+import io
+import json
+
+import pytest
+
+from json_stream import JsonStreamReader
+
+PAYLOAD = {
+    'categories': ["Other", "Café \"quoted\"", "brace } and ] inside"],
+    'transactions': [
+        {'id': 1, 'amount': 12345.678, 'description': "line\nbreak, comma"},
+        {'id': 22, 'amount': -0.5e-3, 'description': "\\ backslash ☃"},
+        {'id': 333, 'amount': 1000000, 'description': ""},
+    ],
+    'next_id': 4000,
+    'budget_limits': {'Other': 10.25},
+}
+
+
+def read(text, chunk_size, array_key='transactions'):
+    reader = JsonStreamReader(io.StringIO(text), chunk_size)
+    items, other = [], {}
+    for key, value in reader.members(array_key):
+        if key == array_key:
+            items.append(value)
+        else:
+            other[key] = value
+    return items, other
+
+
+@pytest.mark.parametrize('indent', [None, 2])
+def test_every_chunk_size_gives_the_same_result(indent):
+    text = json.dumps(PAYLOAD, indent=indent, ensure_ascii=False)
+    expected_other = {k: v for k, v in PAYLOAD.items() if k != 'transactions'}
+    for chunk_size in range(1, len(text) + 2):
+        items, other = read(text, chunk_size)
+        assert items == PAYLOAD['transactions'], chunk_size
+        assert other == expected_other, chunk_size
+
+
+def test_number_split_at_a_chunk_edge_is_read_whole():
+    # '1234' must not come out as 12 when the chunk ends after '12'
+    text = '{"next_id": 1234, "transactions": [5678]}'
+    for chunk_size in range(1, len(text) + 1):
+        assert read(text, chunk_size) == ([5678], {'next_id': 1234}), chunk_size
+
+
+def test_empty_object_and_array():
+    assert read('{}', 1) == ([], {})
+    assert read('{"transactions": []}', 3) == ([], {})
+
+
+def test_truncated_input_raises():
+    text = json.dumps(PAYLOAD)
+    with pytest.raises(ValueError):
+        read(text[:len(text) // 2], 7)
+
+
+def test_array_member_must_be_a_list():
+    with pytest.raises(ValueError):
+        read('{"transactions": {"id": 1}}', 4)
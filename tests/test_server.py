@@ -0,0 +1,101 @@
+import asyncio
+import http.client
+import json
+import socket
+import threading
+
+import pytest
+
+from wallet_core import WalletLedger
+from wallet_server import WalletServer
+
+
+@pytest.fixture(params=['journal', 'sqlite'])
+def server(request, tmp_path):
+    ledger = WalletLedger(request.param, str(tmp_path / 'wallet.json'), str(tmp_path / 'wallet.db')).load()
+    wallet = WalletServer(ledger, batch_window=0)
+    started = threading.Event()
+    state = {}
+
+    def ready(srv):
+        state['port'] = srv.sockets[0].getsockname()[1]
+        state['loop'], state['task'] = asyncio.get_running_loop(), asyncio.current_task()
+        started.set()
+
+    def run():
+        try:
+            asyncio.run(wallet.serve('127.0.0.1', 0, ready))
+        except asyncio.CancelledError:
+            pass
+
+    thread = threading.Thread(target=run, daemon=True)
+    thread.start()
+    assert started.wait(5)
+    yield ledger, state['port']
+    state['loop'].call_soon_threadsafe(state['task'].cancel)
+    thread.join(5)
+    ledger.close()
+
+
+def request(port, method, path, body=None):
+    conn = http.client.HTTPConnection('127.0.0.1', port, timeout=5)
+    conn.request(method, path, json.dumps(body) if body is not None else None)
+    response = conn.getresponse()
+    payload = json.loads(response.read())
+    conn.close()
+    return response.status, payload
+
+
+def expense(**fields):
+    return dict({'amount': 4.5, 'type': 'Expense', 'category': 'Other', 'description': '',
+                 'date': '2026-05-01'}, **fields)
+
+
+@pytest.mark.parametrize('fields', [
+    {'type': 'Bogus'}, {'category': 7}, {'date': 20260501}, {'date': '2026-13-01'},
+    {'amount': 'nan'}, {'amount': '1e400'}, {'amount': -1}, {'amount': ''},
+])
+def test_invalid_transactions_get_400(server, fields):
+    ledger, port = server
+    status, payload = request(port, 'POST', '/transactions', expense(**fields))
+    assert status == 400 and payload['error']
+    assert len(ledger.transactions) == 0
+
+
+def test_null_description_is_empty(server):
+    _, port = server
+    status, payload = request(port, 'POST', '/transactions', expense(description=None))
+    assert status == 200 and payload['description'] == ''
+
+
+def test_out_of_range_ids_are_rejected_and_writes_keep_working(server):
+    _, port = server
+    assert request(port, 'DELETE', '/transactions/99999999999999999999')[0] == 400
+    assert request(port, 'POST', '/transactions/delete', {'ids': [1 << 70]})[0] == 400
+    assert request(port, 'DELETE', '/transactions/12345')[0] == 404
+    status, added = request(port, 'POST', '/transactions', [expense(), expense(amount=2)])
+    assert status == 200 and len(added) == 2
+    assert request(port, 'DELETE', f"/transactions/{added[0]['id']}") == (200, {'deleted': [added[0]['id']]})
+
+
+def test_invalid_months_get_400(server):
+    _, port = server
+    for path in ('/budget?month=bogus', '/budget?month=2026-13', '/overview?month=2026-5'):
+        assert request(port, 'GET', path)[0] == 400, path
+    assert request(port, 'GET', '/budget?month=2026-05')[0] == 200
+
+
+def test_bad_content_length_gets_400(server):
+    _, port = server
+    with socket.create_connection(('127.0.0.1', port), timeout=5) as sock:
+        sock.sendall(b"POST /transactions HTTP/1.1\r\nContent-Length: -5\r\n\r\n")
+        assert sock.recv(100).startswith(b"HTTP/1.1 400")
+
+
+def test_transactions_list_includes_recurring_occurrences(server):
+    ledger, port = server
+    ledger.add_recurring('100', 'Expense', 'Utilities', 'rent', '2026-05-15')
+    request(port, 'POST', '/transactions', expense())
+    status, payload = request(port, 'GET', '/transactions?month=2026-05&sort=date')
+    assert status == 200 and payload['count'] == 2
+    assert [(tx['id'], tx['date']) for tx in payload['transactions']] == [(1, '2026-05-01'), (None, '2026-05-15')]
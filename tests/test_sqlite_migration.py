@@ -0,0 +1,83 @@
+import json
+
+import pytest
+
+import wallet_sqlite
+from wallet_core import WalletLedger
+
+
+def write_snapshot(tmp_path, **payload):
+    path = tmp_path / 'wallet.json'
+    path.write_text(json.dumps(payload), encoding='utf-8')
+    return str(path)
+
+
+def row(tx_id, amount, day='2026-05-01'):
+    return {'id': tx_id, 'date': day, 'type': 'Expense', 'category': 'Other', 'amount': amount,
+            'description': f"row {tx_id}"}
+
+
+def open_sqlite(json_path, tmp_path):
+    return WalletLedger('sqlite', json_path, str(tmp_path / 'wallet.db')).load()
+
+
+def test_snapshot_and_journal_are_migrated(tmp_path):
+    json_path = str(tmp_path / 'wallet.json')
+    ledger = WalletLedger('journal', json_path).load()
+    ledger.storage.compact_every = 3
+    for amount in (1, 2, 3, 4):
+        ledger.add_transaction(str(amount), 'Expense', 'Groceries', '', '2026-05-02')
+    ledger.set_budget('Groceries', '50', '2026-05')
+    ledger.add_recurring('10', 'Expense', 'Utilities', 'rent', '2026-01-15')
+    ledger.close()
+
+    migrated = open_sqlite(json_path, tmp_path)
+    assert [tx.amount for tx in migrated.transactions] == [1.0, 2.0, 3.0, 4.0]
+    assert migrated.budget_for('2026-05')['Groceries'] == 50.0
+    assert list(migrated.recurring) == [1]
+    migrated.close()
+
+
+def test_journal_without_snapshot_is_migrated(tmp_path):
+    json_path = str(tmp_path / 'wallet.json')
+    ledger = WalletLedger('journal', json_path).load()
+    ledger.add_transaction('5', 'Expense', 'Other', 'only in the journal', '2026-05-01')
+    ledger.close()
+    assert not (tmp_path / 'wallet.json').exists()
+
+    migrated = open_sqlite(json_path, tmp_path)
+    assert [tx.description for tx in migrated.transactions] == ['only in the journal']
+    migrated.close()
+
+
+def test_next_id_is_carried_over(tmp_path):
+    json_path = write_snapshot(tmp_path, transactions=[row(1, 5)], categories=['Other'], next_id=10)
+    migrated = open_sqlite(json_path, tmp_path)
+    assert migrated.add_transaction('1', 'Expense', 'Other', '', '2026-05-02').id == 10
+    migrated.close()
+
+
+def test_interrupted_migration_is_redone(tmp_path, monkeypatch):
+    json_path = write_snapshot(tmp_path, transactions=[row(1, 5), row(2, 6)], categories=['Other'],
+                               budget_limits={'Other': 40})
+
+    def crash(self, op, data):
+        raise RuntimeError('crash')
+
+    with monkeypatch.context() as m:
+        m.setattr(wallet_sqlite.SQLiteLedger, '_write', crash)
+        with pytest.raises(RuntimeError):
+            open_sqlite(json_path, tmp_path)
+
+    migrated = open_sqlite(json_path, tmp_path)
+    assert sorted(tx.id for tx in migrated.transactions) == [1, 2]
+    assert migrated.budget_limits == {'Other': 40.0}
+    migrated.close()
+
+
+def test_migration_runs_once(tmp_path):
+    json_path = write_snapshot(tmp_path, transactions=[row(1, 5)], categories=['Other'])
+    open_sqlite(json_path, tmp_path).close()
+    again = open_sqlite(json_path, tmp_path)
+    assert len(again.transactions) == 1
+    again.close()
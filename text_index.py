@@ -0,0 +1,72 @@
+from array import array
+from collections import defaultdict
+
+GRAM = 3
+
+
+def _grams(text):
+    if len(text) < GRAM:
+        return {text} if text else set()
+    return {text[i:i + GRAM] for i in range(len(text) - GRAM + 1)}
+
+
+class NGramIndex:
+    # Trigram -> posting list of keys, kept up to date on add/remove. The text
+    # itself stays with the owner: text_of(key) returns a key's current text, or
+    # None once it is gone, and results are verified against it, so a hit is
+    # exactly `query in text.lower()`. Removed (or re-added) keys leave stale
+    # postings until the next compaction; verification skips them.
+    def __init__(self, text_of):
+        self.text_of = text_of
+        self.clear()
+
+    def clear(self):
+        self.postings = defaultdict(lambda: array('q'))
+        self._size = 0
+        self._stale = 0
+
+    def add(self, key, text):
+        # key is new, or was remove()d first
+        self._size += 1
+        for gram in _grams((text or '').lower()):
+            self.postings[gram].append(key)
+
+    def remove(self, key):
+        self._size -= 1
+        self._stale += 1
+        if self._stale > max(1024, self._size):
+            self._compact()
+
+    def _compact(self):
+        text_of = self.text_of
+        live = {key for keys in self.postings.values() for key in keys if text_of(key) is not None}
+        size = self._size
+        self.clear()
+        for key in live:
+            self.add(key, text_of(key))
+        # keys without any gram (empty text) still count
+        self._size = size
+
+    def search(self, query):
+        # query must be non-empty; callers skip the filter otherwise
+        query = query.lower()
+        if len(query) < GRAM:
+            # any text containing a short query contains it inside one of its grams
+            candidates = set()
+            for gram, keys in self.postings.items():
+                if query in gram:
+                    candidates.update(keys)
+        else:
+            lists = sorted((self.postings.get(g, ()) for g in _grams(query)), key=len)
+            candidates = set(lists[0])
+            for keys in lists[1:3]:
+                candidates.intersection_update(keys)
+                if not candidates:
+                    break
+        text_of = self.text_of
+        hits = []
+        for key in candidates:
+            text = text_of(key)
+            if text is not None and query in text.lower():
+                hits.append(key)
+        return hits
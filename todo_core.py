@@ -0,0 +1,146 @@
+import json
+import os
+import sys
+from datetime import datetime
+from text_index import NGramIndex
+from records import Task
+from instrumentation import instrumented
+
+TASKS_FILE = "tasks.json"
+CATEGORIES = ["General", "Work", "Personal", "Study", "Home", "Shopping"]
+PRIORITIES = ["Low", "Medium", "High"]
+
+
+@instrumented("todo.read_tasks")
+def read_tasks(path):
+    if not os.path.exists(path):
+        return {}
+    with open(path, "r", encoding="utf-8") as f:
+        return json.load(f)
+
+
+@instrumented("todo.write_tasks")
+def write_tasks(path, payload):
+    # write-rename with fsync: a crash leaves either the old file or the new one
+    tmp = path + ".tmp"
+    with open(tmp, "w", encoding="utf-8") as f:
+        json.dump(payload, f, ensure_ascii=False)
+        f.flush()
+        os.fsync(f.fileno())
+    os.replace(tmp, path)
+
+
+class TodoList:
+    # The to-do engine without tkinter: tasks, ids and the search index.
+    # Mutators raise ValueError with a user-facing message on bad input.
+    def __init__(self):
+        self.tasks = {}  # id -> task, in creation order
+        self._id_counter = 1
+        self._done = 0
+        self._search_index = NGramIndex(self._task_text)  # task text, keyed by task id
+        self.dirty = False  # changed since the last snapshot()
+
+    def _task_text(self, tid):
+        t = self.tasks.get(tid)
+        return None if t is None else t.task
+
+    # --- Persistence ---
+    @instrumented("todo.apply")
+    def apply(self, payload):
+        tasks = map(Task.from_dict, payload.get("tasks", []))
+        self.tasks = {t.id: t for t in tasks}
+        self._done = sum(t.done for t in self.tasks.values())
+        self._search_index.clear()
+        for t in self.tasks.values():
+            self._search_index.add(t.id, t.task)
+        # ids are never reused, even after the newest task is deleted
+        self._id_counter = max(payload.get("next_id") or 1, max(self.tasks, default=0) + 1)
+        self.dirty = False
+
+    @instrumented("todo.snapshot")
+    def snapshot(self):
+        # Copy of the current state for a writer thread; marks the list clean
+        self.dirty = False
+        return {"tasks": [t.to_dict() for t in self.tasks.values()], "next_id": self._id_counter}
+
+    def load(self, path=TASKS_FILE):
+        self.apply(read_tasks(path))
+        return self
+
+    def save(self, path=TASKS_FILE):
+        write_tasks(path, self.snapshot())
+
+    # --- Mutations ---
+
+    def add(self, text, category="General", priority="Medium"):
+        text = text.strip()
+        if not text:
+            raise ValueError("Please enter a task.")
+        item = Task(self._id_counter, text, category, priority, datetime.now().strftime("%Y-%m-%d %H:%M"))
+        self._id_counter += 1
+        self.tasks[item.id] = item
+        self._search_index.add(item.id, item.task)
+        self.dirty = True
+        return item
+
+    def get(self, tid):
+        return self.tasks.get(tid)
+
+    def toggle(self, tid):
+        t = self.get(tid)
+        if t:
+            t.done = not t.done
+            self._done += 1 if t.done else -1
+            self.dirty = True
+        return t
+
+    def edit(self, tid, text, category=None, priority=None):
+        t = self.get(tid)
+        if not t:
+            return None
+        text = text.strip()
+        if not text:
+            raise ValueError("Please enter a task.")
+        t.task = text
+        t.category = sys.intern((category or t.category).strip())
+        t.priority = sys.intern((priority or t.priority).strip().capitalize())
+        self._search_index.remove(t.id)
+        self._search_index.add(t.id, t.task)
+        self.dirty = True
+        return t
+
+    def delete(self, tid):
+        t = self.tasks.pop(tid, None)
+        if not t:
+            return False
+        self._done -= t.done
+        self._search_index.remove(tid)
+        self.dirty = True
+        return True
+
+    def clear(self):
+        self.tasks.clear()
+        self._done = 0
+        self._search_index.clear()
+        self.dirty = True
+
+    # --- Queries ---
+    def filter(self, query="", category="All", status="All"):
+        query = query.lower().strip()
+        if query:
+            # only the index's hits are visited; ids are handed out in creation order
+            tasks = (self.tasks[tid] for tid in sorted(self._search_index.search(query)))
+        else:
+            tasks = self.tasks.values()
+        for t in tasks:
+            if category != "All" and t.category != category:
+                continue
+            if status == "Pending" and t.done:
+                continue
+            if status == "Done" and not t.done:
+                continue
+            yield t
+
+    def stats(self):
+        total = len(self.tasks)
+        return total, self._done, total - self._done
@@ -1,7 +1,14 @@
+import os
+import sys
 import tkinter as tk
 from tkinter import ttk, messagebox, simpledialog
-from datetime import datetime
 import tkinter.font as tkfont
+from refresh_scheduler import RefreshScheduler
+from io_executor import IOExecutor
+from todo_core import TodoList, CATEGORIES, PRIORITIES, TASKS_FILE, write_tasks
+from instrumentation import PROFILER, enable_from
+
+AUTOSAVE_MS = 2000  # changes within this window share one write
 
 class ModernToDo:
     def __init__(self, root):
@@ -11,14 +18,25 @@ class ModernToDo:
         self.root.minsize(900, 600)
         self.root.configure(bg="#f9fafb")
 
-        self.tasks = []
-        self._id_counter = 1
+        self.todo = TodoList()
+        self._loading = True
+        self._read_only = False  # load failed and the file couldn't be moved aside: never save over it
+        self._save_after = None
+        self._io = IOExecutor(self.root)
+        self.root.protocol("WM_DELETE_WINDOW", self._on_close)
 
         self.font_main = tkfont.Font(family="Segoe UI", size=11)
         self.font_bold = tkfont.Font(family="Segoe UI", size=12, weight="bold")
         self.font_title = tkfont.Font(family="Segoe UI", size=18, weight="bold")
 
         self._build_ui()
+        self._refresh = RefreshScheduler(self.root, {
+            "table": self._rebuild_table,
+            "stats": self._update_stats,
+        }, name="todo._refresh_view")
+        # the window comes up empty; tasks are read and indexed on the I/O worker
+        self._io.submit("load", lambda job: TodoList().load(TASKS_FILE),
+                        on_done=self._apply_loaded, on_error=self._load_failed)
 
     def _build_ui(self):
         # HEADER
@@ -36,12 +54,12 @@ class ModernToDo:
 
         tk.Label(new_frame, text="Category:", bg="#f9fafb", font=self.font_bold).grid(row=0, column=2, sticky="w")
         self.cat_var = tk.StringVar(value="General")
-        cat_box = ttk.Combobox(new_frame, textvariable=self.cat_var, values=["General","Work","Personal","Study","Home","Shopping"], width=12, state="readonly")
+        cat_box = ttk.Combobox(new_frame, textvariable=self.cat_var, values=CATEGORIES, width=12, state="readonly")
         cat_box.grid(row=0, column=3, padx=(5,15))
 
         tk.Label(new_frame, text="Priority:", bg="#f9fafb", font=self.font_bold).grid(row=0, column=4, sticky="w")
         self.prio_var = tk.StringVar(value="Medium")
-        prio_box = ttk.Combobox(new_frame, textvariable=self.prio_var, values=["Low","Medium","High"], width=10, state="readonly")
+        prio_box = ttk.Combobox(new_frame, textvariable=self.prio_var, values=PRIORITIES, width=10, state="readonly")
         prio_box.grid(row=0, column=5, padx=(5,15))
 
         add_btn = tk.Button(new_frame, text="➕ Add", bg="#22c55e", fg="white", relief="flat",
@@ -56,19 +74,19 @@ class ModernToDo:
         self.search_var = tk.StringVar()
         search_box = tk.Entry(filter_frame, textvariable=self.search_var, width=30, relief="solid", bd=1)
         search_box.grid(row=0, column=1, padx=(6,20))
-        search_box.bind("<KeyRelease>", lambda e: self._refresh_view())
+        search_box.bind("<KeyRelease>", lambda e: self._refresh.mark("table"))
 
         tk.Label(filter_frame, text="Category:", bg="#ffffff").grid(row=0, column=2)
         self.filter_cat = tk.StringVar(value="All")
-        ttk.Combobox(filter_frame, textvariable=self.filter_cat, values=["All","General","Work","Personal","Study","Home","Shopping"],
+        ttk.Combobox(filter_frame, textvariable=self.filter_cat, values=["All"] + CATEGORIES,
                      width=12, state="readonly").grid(row=0, column=3, padx=(6,20))
-        self.filter_cat.trace_add("write", lambda *a: self._refresh_view())
+        self.filter_cat.trace_add("write", lambda *a: self._refresh.mark("table"))
 
         tk.Label(filter_frame, text="Status:", bg="#ffffff").grid(row=0, column=4)
         self.filter_status = tk.StringVar(value="All")
         ttk.Combobox(filter_frame, textvariable=self.filter_status, values=["All","Pending","Done"],
                      width=10, state="readonly").grid(row=0, column=5, padx=(6,0))
-        self.filter_status.trace_add("write", lambda *a: self._refresh_view())
+        self.filter_status.trace_add("write", lambda *a: self._refresh.mark("table"))
 
         # TABLE
         table_frame = tk.Frame(self.root, bg="#f9fafb")
@@ -113,106 +131,156 @@ class ModernToDo:
         # double click edit
         self.tree.bind("<Double-1>", lambda e: self._edit_task())
 
+    # ========== PERSISTENCE ==========
+    def _apply_loaded(self, todo):
+        self.todo = todo
+        self._loading = False
+        self._refresh_view()
+
+    def _load_failed(self, e):
+        # move the unreadable file aside, then carry on with an empty list
+        bad = TASKS_FILE + ".bad"
+        n = 1
+        while os.path.exists(bad):
+            bad, n = f"{TASKS_FILE}.bad{n}", n + 1
+        try:
+            os.replace(TASKS_FILE, bad)
+        except OSError as move_error:
+            # it can't be kept safe, so the (empty) list is read-only and never saved
+            messagebox.showerror("Load Error", f"Failed to load {TASKS_FILE}: {e}\n\n"
+                                               f"It could not be moved aside either ({move_error}), "
+                                               f"so changes are disabled.")
+            self._read_only = True
+            self._loading = False
+            return
+        messagebox.showerror("Load Error", f"Failed to load {TASKS_FILE}: {e}\n\n"
+                                           f"It was kept as {bad}; starting with an empty list.")
+        self._apply_loaded(TodoList())
+
+    def _busy(self):
+        if self._read_only:
+            messagebox.showwarning("Read Only", f"{TASKS_FILE} could not be loaded, so changes are disabled "
+                                                f"to keep it intact.")
+            return True
+        if self._loading:
+            messagebox.showinfo("Please wait", "Tasks are still loading.")
+        return self._loading
+
+    def _schedule_save(self):
+        if self._save_after is None and not self._loading:
+            self._save_after = self.root.after(AUTOSAVE_MS, self._autosave)
+
+    def _autosave(self):
+        self._save_after = None
+        if self.todo.dirty:
+            self._io.submit("save", lambda job, payload: write_tasks(TASKS_FILE, payload),
+                            prepare=self.todo.snapshot, on_error=self._save_failed)
+
+    def _save_failed(self, e):
+        self.todo.dirty = True
+        messagebox.showerror("Save Error", f"Failed to save tasks: {e}")
+
+    def _on_close(self):
+        if self._save_after is not None:
+            self.root.after_cancel(self._save_after)
+        # a save still running may fail after its error callback can no longer
+        # run (snapshot() already cleared dirty), so write once more to be sure
+        saving = self._io.busy("save")
+        self._io.close()
+        if (self.todo.dirty or saving) and not self._loading and not self._read_only:
+            try:
+                self.todo.save(TASKS_FILE)
+            except Exception as e:
+                messagebox.showerror("Save Error", f"Failed to save tasks: {e}")
+        PROFILER.finish()
+        self.root.destroy()
+
     # ========== LOGIC ==========
     def _add_task(self):
-        text = self.task_var.get().strip()
-        if not text:
-            messagebox.showwarning("Empty", "Please enter a task.")
+        if self._busy(): return
+        try:
+            self.todo.add(self.task_var.get(), self.cat_var.get(), self.prio_var.get())
+        except ValueError as e:
+            messagebox.showwarning("Empty", str(e))
             return
-        item = {
-            "id": self._id_counter,
-            "task": text,
-            "category": self.cat_var.get(),
-            "priority": self.prio_var.get(),
-            "created": datetime.now().strftime("%Y-%m-%d %H:%M"),
-            "done": False
-        }
-        self._id_counter += 1
-        self.tasks.append(item)
         self.task_var.set("")
         self._refresh_view()
 
     def _refresh_view(self):
+        # tasks changed: rebuild table and stats once on the next idle turn
+        self._refresh.mark(delay=0)
+        if self.todo.dirty:
+            self._schedule_save()
+
+    def _rebuild_table(self):
         for i in self.tree.get_children():
             self.tree.delete(i)
 
-        query = self.search_var.get().lower().strip()
-        cat = self.filter_cat.get()
-        status = self.filter_status.get()
-
-        for t in self.tasks:
-            if query and query not in t["task"].lower():
-                continue
-            if cat != "All" and t["category"] != cat:
-                continue
-            if status == "Pending" and t["done"]:
-                continue
-            if status == "Done" and not t["done"]:
-                continue
-
-            st = "✅ Done" if t["done"] else "⏳ Pending"
-            tag = "done" if t["done"] else "pending"
-            self.tree.insert("", "end", iid=f"t-{t['id']}",
-                             values=(st, t["priority"], t["category"], t["task"], t["created"]),
+        for t in self.todo.filter(self.search_var.get(), self.filter_cat.get(), self.filter_status.get()):
+            st = "✅ Done" if t.done else "⏳ Pending"
+            tag = "done" if t.done else "pending"
+            self.tree.insert("", "end", iid=f"t-{t.id}",
+                             values=(st, t.priority, t.category, t.task, t.created),
                              tags=(tag,))
-        self._update_stats()
 
     def _get_selected(self):
         sel = self.tree.selection()
         if not sel:
             messagebox.showinfo("Select", "Select a task first.")
             return None
-        tid = int(sel[0].split("-")[1])
-        for t in self.tasks:
-            if t["id"] == tid:
-                return t
-        return None
+        return self.todo.get(int(sel[0].split("-")[1]))
 
     def _toggle_done(self):
+        if self._busy(): return
         t = self._get_selected()
         if not t: return
-        t["done"] = not t["done"]
+        self.todo.toggle(t.id)
         self._refresh_view()
 
     def _edit_task(self):
+        if self._busy(): return
         t = self._get_selected()
         if not t: return
-        new_text = simpledialog.askstring("Edit Task", "Task:", initialvalue=t["task"])
+        new_text = simpledialog.askstring("Edit Task", "Task:", initialvalue=t.task)
         if not new_text: return
-        new_cat = simpledialog.askstring("Edit Category", "Category:", initialvalue=t["category"]) or t["category"]
-        new_prio = simpledialog.askstring("Edit Priority", "Priority (Low/Medium/High):", initialvalue=t["priority"]) or t["priority"]
-        t["task"], t["category"], t["priority"] = new_text.strip(), new_cat.strip(), new_prio.strip().capitalize()
+        new_cat = simpledialog.askstring("Edit Category", "Category:", initialvalue=t.category) or t.category
+        new_prio = simpledialog.askstring("Edit Priority", "Priority (Low/Medium/High):", initialvalue=t.priority) or t.priority
+        try:
+            self.todo.edit(t.id, new_text, new_cat, new_prio)
+        except ValueError as e:
+            messagebox.showwarning("Empty", str(e))
+            return
         self._refresh_view()
 
     def _delete_task(self):
+        if self._busy(): return
         t = self._get_selected()
         if not t: return
         if messagebox.askyesno("Delete", "Delete selected task?"):
-            self.tasks = [x for x in self.tasks if x["id"] != t["id"]]
+            self.todo.delete(t.id)
             self._refresh_view()
 
     def _delete_all(self):
-        if not self.tasks:
+        if self._busy(): return
+        if not self.todo.tasks:
             messagebox.showinfo("Info", "No tasks to delete.")
             return
         if messagebox.askyesno("Confirm", "Are you sure you want to delete ALL tasks?"):
-            self.tasks.clear()
+            self.todo.clear()
             self._refresh_view()
             messagebox.showinfo("Deleted", "All tasks have been deleted.")
 
 
     def _show_stats(self):
-        total = len(self.tasks)
-        done = sum(t["done"] for t in self.tasks)
+        total, done, _ = self.todo.stats()
         messagebox.showinfo("Stats", f"Total: {total}\nCompleted: {done}\nPending: {total-done}")
 
     def _update_stats(self):
-        total = len(self.tasks)
-        done = sum(t["done"] for t in self.tasks)
-        pending = total - done
+        total, done, pending = self.todo.stats()
         self.stats_label.config(text=f"Tasks: {total}   |   ✅ Completed: {done}   |   ⏳ Pending: {pending}")
 
 if __name__ == "__main__":
+    enable_from(sys.argv)
     root = tk.Tk()
     app = ModernToDo(root)
     root.mainloop()
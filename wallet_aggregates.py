@@ -0,0 +1,93 @@
+from collections import defaultdict
+
+
+class LedgerAggregates:
+    # Running [total, count] cells keyed by (month, type, category) plus the
+    # rollups the wallet views read, all kept in step on every add/remove.
+    # Totals are integer cents; the queries return currency units.
+    def __init__(self):
+        self.clear()
+
+    def clear(self):
+        self.cells = defaultdict(lambda: [0, 0])          # (month, type, category)
+        self.by_type = defaultdict(lambda: [0, 0])        # type
+        self.by_month_type = defaultdict(lambda: [0, 0])  # (month, type)
+        self.by_type_category = defaultdict(lambda: [0, 0])  # (type, category)
+        self.version = 0
+
+    def rebuild(self, transactions):
+        self.clear()
+        for tx in transactions:
+            self.add(tx)
+
+    def load_cells(self, cells):
+        # Rebuild from pre-grouped (month, type, category, total cents, count) rows
+        self.clear()
+        for month, tx_type, category, total, count in cells:
+            for table, key in ((self.cells, (month, tx_type, category)),
+                               (self.by_type, tx_type),
+                               (self.by_month_type, (month, tx_type)),
+                               (self.by_type_category, (tx_type, category))):
+                cell = table[key]
+                cell[0] += total
+                cell[1] += count
+        self.version += 1
+
+    def add(self, tx):
+        self._apply(tx, 1)
+
+    def remove(self, tx):
+        self._apply(tx, -1)
+
+    def _apply(self, tx, sign):
+        self._add(tx.date[:7], tx.type, tx.category, tx.cents * sign, sign)
+        self.version += 1
+
+    def add_cells(self, cells, sign=1):
+        # Merge (or with sign=-1 take back) {(month, type, category): [total, count]}
+        for (month, tx_type, category), (total, count) in cells.items():
+            self._add(month, tx_type, category, total * sign, count * sign)
+        self.version += 1
+
+    def _add(self, month, tx_type, category, total, count):
+        for table, key in ((self.cells, (month, tx_type, category)),
+                           (self.by_type, tx_type),
+                           (self.by_month_type, (month, tx_type)),
+                           (self.by_type_category, (tx_type, category))):
+            cell = table[key]
+            cell[0] += total
+            cell[1] += count
+            if cell[1] <= 0:
+                del table[key]
+
+    # --- Queries ---
+    def total(self, tx_type):
+        cell = self.by_type.get(tx_type)
+        return cell[0] / 100 if cell else 0.0
+
+    def count(self, tx_type=None):
+        if tx_type is None:
+            return sum(cell[1] for cell in self.by_type.values())
+        cell = self.by_type.get(tx_type)
+        return cell[1] if cell else 0
+
+    def month_total(self, month, tx_type):
+        cell = self.by_month_type.get((month, tx_type))
+        return cell[0] / 100 if cell else 0.0
+
+    def months(self):
+        return sorted({month for month, _ in self.by_month_type})
+
+    def spent(self, month, category):
+        cell = self.cells.get((month, 'Expense', category))
+        return cell[0] / 100 if cell else 0.0
+
+    def category_totals(self, tx_type):
+        return {c: cell[0] / 100 for (t, c), cell in self.by_type_category.items() if t == tx_type}
+
+    def monthly_income_expenses(self):
+        # Anything that is not Income counts as an expense, as in the trend chart
+        monthly = defaultdict(lambda: {'income': 0, 'expenses': 0})
+        for (month, tx_type), cell in self.by_month_type.items():
+            monthly[month]['income' if tx_type == 'Income' else 'expenses'] += cell[0] / 100
+        return monthly
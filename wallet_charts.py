@@ -0,0 +1,50 @@
+import math
+
+
+class ChartBlitter:
+    # Keeps a copy of the static figure and redraws only the animated artists on top
+    def __init__(self, canvas):
+        self.canvas = canvas
+        self.artists = []
+        self._background = None
+        canvas.mpl_connect('draw_event', self._on_draw)
+
+    def set_artists(self, artists):
+        self.artists = list(artists)
+        for artist in self.artists:
+            artist.set_animated(True)
+        self._background = None
+
+    def _on_draw(self, event):
+        self._background = self.canvas.copy_from_bbox(self.canvas.figure.bbox)
+        self._draw_artists()
+
+    def _draw_artists(self):
+        for artist in self.artists:
+            self.canvas.figure.draw_artist(artist)
+
+    def update(self):
+        if self._background is None:
+            self.canvas.draw()
+            return
+        self.canvas.restore_region(self._background)
+        self._draw_artists()
+        self.canvas.blit(self.canvas.figure.bbox)
+
+
+def update_pie(wedges, texts, autotexts, amounts, startangle=90, labeldistance=1.1, pctdistance=0.6):
+    # Same geometry as Axes.pie, applied to the existing wedge and text artists
+    total = float(sum(amounts))
+    theta1 = startangle
+    for wedge, text, autotext, amount in zip(wedges, texts, autotexts, amounts):
+        frac = amount / total if total else 0.0
+        theta2 = theta1 + 360 * frac
+        mid = math.radians((theta1 + theta2) / 2)
+        x, y = math.cos(mid), math.sin(mid)
+        wedge.set_theta1(theta1)
+        wedge.set_theta2(theta2)
+        text.set_position((labeldistance * x, labeldistance * y))
+        text.set_horizontalalignment('left' if x > 0 else 'right')
+        autotext.set_position((pctdistance * x, pctdistance * y))
+        autotext.set_text(f"{frac * 100:1.1f}%")
+        theta1 = theta2
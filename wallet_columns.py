@@ -0,0 +1,313 @@
+import copy
+from datetime import datetime, date
+
+import numpy as np
+
+from text_index import NGramIndex
+from records import Transaction
+
+INITIAL_CAPACITY = 1024
+NUMERIC_COLUMNS = ('ids', 'days', 'cents', 'type_codes', 'category_codes')
+ALL_COLUMNS = NUMERIC_COLUMNS + ('descriptions', 'live')
+COMPACT_MIN_DEAD = 4096  # deleted slots tolerated before the arrays are squeezed
+SORT_COLUMNS = {'id': 'ids', 'date': 'days', 'type': 'type_codes', 'category': 'category_codes',
+                'amount': 'cents', 'description': 'descriptions'}
+
+
+class TransactionColumns:
+    # One typed array per field: dates as day ordinals, amounts as int64 cents,
+    # type and category dictionary-encoded to small ints. Rows go in and come
+    # back out as records.Transaction.
+    # Deletes only clear a slot's live flag; the keys handed out by
+    # filter_indices() are slots and stay valid until the next delete.
+    def __init__(self, transactions=()):
+        self.size = 0   # slots in use, live or not
+        self.dead = 0
+        self.ids = np.empty(INITIAL_CAPACITY, dtype=np.int64)
+        self.days = np.empty(INITIAL_CAPACITY, dtype=np.int32)
+        self.cents = np.empty(INITIAL_CAPACITY, dtype=np.int64)
+        self.type_codes = np.empty(INITIAL_CAPACITY, dtype=np.int16)
+        self.category_codes = np.empty(INITIAL_CAPACITY, dtype=np.int32)
+        self.descriptions = np.empty(INITIAL_CAPACITY, dtype=object)
+        self.live = np.empty(INITIAL_CAPACITY, dtype=bool)
+        self._slots = {}  # id -> slot
+        self.types, self._type_codes = [], {}
+        self.categories, self._category_codes = [], {}
+        self._day_ordinals = {}  # date string as entered -> ordinal
+        self._day_strings = {}   # ordinal -> YYYY-MM-DD
+        self._odd_days = 0       # sentinel ordinals handed out to dates that don't parse
+        self.text_index = NGramIndex(self._description)  # description search, keyed by id
+        self._sorted = {}  # column -> (slots in sort order, their sort keys)
+        self.extend(transactions)
+
+    # --- Encoding ---
+    def _encode(self, values, codes, value):
+        code = codes.get(value)
+        if code is None:
+            code = codes[value] = len(values)
+            values.append(value)
+        return code
+
+    def _day(self, date_str):
+        day = self._day_ordinals.get(date_str)
+        if day is None:
+            try:
+                day = datetime.strptime(date_str, "%Y-%m-%d").toordinal()
+                self._day_strings.setdefault(day, date.fromordinal(day).isoformat())
+            except (TypeError, ValueError):
+                # older files can hold unchecked dates ('05/01/2024'); the row keeps
+                # its text under a sentinel day, before every real one (those are >= 1)
+                self._odd_days += 1
+                day = -self._odd_days
+                self._day_strings[day] = date_str
+            self._day_ordinals[date_str] = day
+        return day
+
+    def _description(self, tx_id):
+        slot = self._slots.get(tx_id)
+        return None if slot is None else self.descriptions[slot]
+
+    def _reserve(self, extra):
+        needed = self.size + extra
+        capacity = len(self.ids)
+        if needed <= capacity:
+            return
+        while capacity < needed:
+            capacity *= 2
+        for name in ALL_COLUMNS:
+            old = getattr(self, name)
+            new = np.empty(capacity, dtype=old.dtype)
+            new[:self.size] = old[:self.size]
+            setattr(self, name, new)
+
+    # --- Mutation ---
+    def append(self, tx):
+        self.extend((tx,))
+
+    def extend(self, transactions):
+        transactions = list(transactions)
+        self._reserve(len(transactions))
+        start = i = self.size
+        n_types, n_cats = len(self.types), len(self.categories)
+        for tx in transactions:
+            self.ids[i] = tx.id
+            self.days[i] = self._day(tx.date)
+            self.cents[i] = tx.cents
+            self.type_codes[i] = self._encode(self.types, self._type_codes, tx.type)
+            self.category_codes[i] = self._encode(self.categories, self._category_codes, tx.category)
+            self.descriptions[i] = tx.description
+            self.live[i] = True
+            self._slots[tx.id] = i
+            self.text_index.add(tx.id, tx.description)
+            i += 1
+        self.size = i
+        # a new type or category shifts the ranks its order is keyed on
+        if len(self.types) != n_types:
+            self._sorted.pop('type', None)
+        if len(self.categories) != n_cats:
+            self._sorted.pop('category', None)
+        if self._sorted and i > start:
+            self._insert_sorted(np.arange(start, i))
+
+    def remove_ids(self, ids):
+        # O(k) through the id index. Returns the removed rows so callers can
+        # unwind their own bookkeeping
+        slots = [self._slots.pop(tx_id) for tx_id in ids if tx_id in self._slots]
+        removed = [self[i] for i in slots]
+        for tx in removed:
+            self.text_index.remove(tx.id)
+        self.live[slots] = False
+        self.dead += len(slots)
+        if self.dead > COMPACT_MIN_DEAD and self.dead * 2 > self.size:
+            self._compact()
+        return removed
+
+    def _compact(self):
+        n = self.size
+        keep = self.live[:n].copy()
+        kept = n - self.dead
+        for name in ALL_COLUMNS:
+            column = getattr(self, name)
+            column[:kept] = column[:n][keep]
+        self.descriptions[kept:n] = None
+        self.size, self.dead = kept, 0
+        self._slots = {tx_id: i for i, tx_id in enumerate(self.ids[:kept].tolist())}
+        # renumber the sort orders instead of re-sorting; this is where deleted slots leave them
+        new_slot = np.cumsum(keep) - 1
+        for column, (order, keys) in list(self._sorted.items()):
+            alive = keep[order]
+            self._sorted[column] = (new_slot[order[alive]], keys[alive])
+
+    # --- Rows ---
+    def __len__(self):
+        return self.size - self.dead
+
+    def __getitem__(self, i):
+        # i is a slot, as returned by filter_indices()
+        if not 0 <= i < self.size or not self.live[i]:
+            raise IndexError(i)
+        i = int(i)
+        return Transaction(int(self.ids[i]), self._day_strings[int(self.days[i])], self.types[self.type_codes[i]],
+                           self.categories[self.category_codes[i]], int(self.cents[i]), self.descriptions[i])
+
+    def get(self, tx_id):
+        slot = self._slots.get(tx_id)
+        return None if slot is None else self[slot]
+
+    def _column(self, name):
+        column = getattr(self, name)[:self.size]
+        return column[self.live[:self.size]] if self.dead else column
+
+    def __iter__(self):
+        types, categories, day_strings = self.types, self.categories, self._day_strings
+        for tx_id, day, tx_type, category, cents, desc in zip(
+                self._column('ids').tolist(), self._column('days').tolist(), self._column('type_codes').tolist(),
+                self._column('category_codes').tolist(), self._column('cents').tolist(),
+                self._column('descriptions')):
+            yield Transaction(tx_id, day_strings[day], types[tx_type], categories[category], cents, desc)
+
+    def to_records(self):
+        # plain dicts, the JSON file's layout
+        return [tx.to_dict() for tx in self]
+
+    def snapshot(self, **filters):
+        # Frozen copy of the live rows (or of those passing filter_indices(**filters))
+        # for a worker thread; the code lists are append-only so they can be shared
+        keys = self.filter_indices(**filters) if any(filters.values()) else None
+        snap = copy.copy(self)
+        for name in ALL_COLUMNS:
+            if keys is None:
+                setattr(snap, name, self._column(name).copy())
+            else:
+                setattr(snap, name, getattr(self, name)[keys])
+        snap.size, snap.dead = len(snap.ids), 0
+        snap._day_strings = dict(self._day_strings)
+        snap._slots = None
+        snap.text_index = None
+        snap._sorted = {}
+        return snap
+
+    def csv_chunks(self, chunk_size):
+        # (id, date, type, category, amount, description) tuples, built a column at a time
+        types, categories, day_strings = self.types, self.categories, self._day_strings
+        ids, days, type_codes, category_codes, cents, descriptions = (
+            self._column(name) for name in ('ids', 'days', 'type_codes', 'category_codes', 'cents', 'descriptions'))
+        for start in range(0, len(ids), chunk_size):
+            stop = start + chunk_size
+            yield list(zip(
+                ids[start:stop].tolist(),
+                map(day_strings.__getitem__, days[start:stop].tolist()),
+                map(types.__getitem__, type_codes[start:stop].tolist()),
+                map(categories.__getitem__, category_codes[start:stop].tolist()),
+                map('%.2f'.__mod__, (cents[start:stop] / 100).tolist()),
+                descriptions[start:stop].tolist()))
+
+    def max_id(self):
+        return int(self._column('ids').max()) if len(self) else 0
+
+    def aggregate_cells(self):
+        # (month, type, category, total cents, count) rows, grouped with bincount
+        if self.dead:
+            self._compact()
+        n = self.size
+        if not n:
+            return []
+        months = sorted({s[:7] for s in self._day_strings.values()})
+        month_codes = {m: i for i, m in enumerate(months)}
+        low = min(self._day_strings)
+        day_month = np.zeros(max(self._day_strings) - low + 1, dtype=np.int64)
+        for day, s in self._day_strings.items():
+            day_month[day - low] = month_codes[s[:7]]
+        n_types, n_cats = len(self.types), len(self.categories)
+        keys = ((day_month[self.days[:n] - low] * n_types + self.type_codes[:n]) * n_cats
+                + self.category_codes[:n])
+        uniq, inverse = np.unique(keys, return_inverse=True)
+        # float64 sums of whole cents are exact up to 2**53
+        totals = np.bincount(inverse, weights=self.cents[:n]).astype(np.int64)
+        counts = np.bincount(inverse)
+        cells = []
+        for key, total, count in zip(uniq.tolist(), totals.tolist(), counts.tolist()):
+            rest, category = divmod(key, n_cats)
+            month, tx_type = divmod(rest, n_types)
+            cells.append((months[month], self.types[tx_type], self.categories[category], total, count))
+        return cells
+
+    # --- Filtering ---
+    def _lookup(self, column, values):
+        # Membership against a small set of codes via a lookup table; cheaper than np.isin
+        if not values:
+            return np.zeros(len(column), dtype=bool)
+        low = min(values)
+        table = np.zeros(max(values) - low + 1, dtype=bool)
+        table[np.asarray(values) - low] = True
+        offsets = column.astype(np.int64) - low
+        inside = (offsets >= 0) & (offsets < len(table))
+        hit = np.zeros(len(column), dtype=bool)
+        hit[inside] = table[offsets[inside]]
+        return hit
+
+    def filter_indices(self, search=None, category=None, tx_type=None, month=None, sort=None):
+        # None means "no filter"; masks are combined and turned into indices once,
+        # in slot order or in the order of the sort column
+        n = self.size
+        mask = self.live[:n].copy()
+        if category is not None:
+            mask &= self.category_codes[:n] == self._category_codes.get(category, -1)
+        if tx_type is not None:
+            mask &= self.type_codes[:n] == self._type_codes.get(tx_type, -1)
+        if month:
+            # ISO dates sort chronologically, so a str.startswith prefix is one day range
+            days = [d for d, s in self._day_strings.items() if s.startswith(month)]
+            if not days:
+                return np.empty(0, dtype=np.intp)
+            column = self.days[:n]
+            real = [d for d in days if d >= 1]
+            in_month = (column >= min(real)) & (column <= max(real)) if real else np.zeros(n, dtype=bool)
+            # unparsed dates ('2024-05-32') sit below every real day; match them exactly
+            odd = [d for d in days if d < 1]
+            if odd:
+                in_month |= np.isin(column, odd)
+            mask &= in_month
+        if search:
+            # categories are matched on the small code dictionary, descriptions via the index
+            cat_hits = [code for code, c in enumerate(self.categories) if search in c.lower()]
+            by_category = self._lookup(self.category_codes[:n], cat_hits)
+            hits = np.fromiter(self.text_index.search(search), dtype=np.int64)
+            mask &= by_category | np.isin(self.ids[:n], hits)
+        if sort is None:
+            return np.flatnonzero(mask)
+        order = self.sort_order(sort)
+        return order[mask[order]]
+
+    # --- Sorting ---
+    def _sort_keys(self, column, slots):
+        # type and category sort by the rank of their name, descriptions case-insensitively
+        if column in ('type', 'category'):
+            values = self.types if column == 'type' else self.categories
+            ranks = np.empty(len(values), dtype=np.int32)
+            ranks[sorted(range(len(values)), key=values.__getitem__)] = np.arange(len(values))
+            return ranks[getattr(self, SORT_COLUMNS[column])[slots]]
+        if column == 'description':
+            return np.array([d.lower() for d in self.descriptions[slots]], dtype=object)
+        return getattr(self, SORT_COLUMNS[column])[slots]
+
+    def sort_order(self, column):
+        # Slots ordered by column, ties in insertion (id) order. Sorted once on
+        # first use, then extend() bisects new rows in; deleted slots stay until
+        # the next compaction and are dropped by the live mask in filter_indices()
+        if column not in SORT_COLUMNS:
+            raise KeyError(column)
+        if column not in self._sorted:
+            keys = self._sort_keys(column, slice(0, self.size))
+            order = np.argsort(keys, kind='stable')
+            self._sorted[column] = (order, keys[order])
+        return self._sorted[column][0]
+
+    def _insert_sorted(self, slots):
+        for column, (order, keys) in list(self._sorted.items()):
+            new_keys = self._sort_keys(column, slots)
+            by_key = np.argsort(new_keys, kind='stable')
+            new_keys = new_keys[by_key]
+            # side='right': new rows have the largest ids, so they go after equal keys
+            at = np.searchsorted(keys, new_keys, side='right')
+            self._sorted[column] = (np.insert(order, at, slots[by_key]), np.insert(keys, at, new_keys))
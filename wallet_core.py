@@ -0,0 +1,597 @@
+import argparse
+import bisect
+import json
+import math
+import os
+import sys
+from datetime import date, datetime
+
+import numpy as np
+
+from wallet_journal import TransactionJournal
+from wallet_aggregates import LedgerAggregates
+from wallet_columns import TransactionColumns
+from wallet_sqlite import SQLiteLedger
+from json_stream import JsonStreamReader
+from wallet_forecast import SpendMatrix
+from wallet_export import write_csv, EXPORT_CHUNK
+from wallet_statements import parse_statement, existing_keys, dedupe, COLUMN_FIELDS
+from records import Transaction, transaction_hook
+from wallet_recurring import RecurringRule, FREQUENCIES, iter_occurrences, occurrence_cells, month_bounds
+from instrumentation import instrumented
+
+DATA_FILE = "transactions.json"
+DB_FILE = "transactions.db"
+STORAGE_MODE = "journal"  # "journal" appends each change to a log, "snapshot" rewrites DATA_FILE on every save,
+                          # "sqlite" keeps the ledger in DB_FILE (migrated from DATA_FILE on first start)
+IMPORT_BATCH = 5000  # records parsed per batch during import
+STATEMENT_MAPPING_FILE = "statement_mapping.json"  # optional CSV column mapping for bank statements
+TRANSACTION_TYPES = ("Income", "Expense")
+DEFAULT_CATEGORIES = ["Salary", "Groceries", "Transport", "Entertainment", "Utilities", "Other"]
+# history sort column -> key matching the stores' order, for merging in recurring occurrences
+OCCURRENCE_SORT_KEYS = {'date': lambda tx: tx.date, 'type': lambda tx: tx.type, 'category': lambda tx: tx.category,
+                        'amount': lambda tx: tx.cents, 'description': lambda tx: tx.description.lower()}
+
+
+def parse_month(value):
+    # 'YYYY-MM' naming a real month, for months given on the command line or
+    # over the API; ValueError with a user-facing message otherwise
+    if not (len(value) == 7 and value[4] == '-' and value[:4].isdigit() and value[5:].isdigit()
+            and 1 <= int(value[5:]) <= 12):
+        raise ValueError(f"Month must be YYYY-MM, not '{value}'")
+    return value
+
+
+def month_arg(value):
+    # argparse type for --month
+    try:
+        return parse_month(value)
+    except ValueError as e:
+        raise argparse.ArgumentTypeError(str(e)) from None
+
+
+def effective_budgets(budget_limits, budget_history, month):
+    # category -> limit in effect for month: the latest dated entry at or
+    # before it, else the undated limit
+    limits = {c: float(v) for c, v in budget_limits.items()}
+    for category, months in budget_history.items():
+        effective = max((m for m in months if m <= month), default=None)
+        if effective is not None:
+            limits[category] = float(months[effective])
+    return limits
+
+
+class WalletLedger:
+    # Everything the wallet knows about money, without tkinter or matplotlib.
+    # Mutators raise ValueError with a user-facing message on bad input.
+    def __init__(self, storage_mode=STORAGE_MODE, data_file=DATA_FILE, db_file=DB_FILE, on_snapshot_save=None):
+        self.data_file = data_file
+        self.transactions = TransactionColumns()
+        self.categories = list(DEFAULT_CATEGORIES)
+        self.budget_limits = {}   # category -> limit wherever no dated entry applies
+        self.budget_history = {}  # category -> {month: limit from that month on}
+        self._spend = None        # SpendMatrix, rebuilt when the aggregates move
+        self.aggregates = LedgerAggregates()
+        self._next_id = 1  # monotonic; persisted so deleted ids are never handed out again
+        self.recurring = {}  # rule id -> RecurringRule; occurrences are generated, never stored
+        self._recurring_cells = None  # (through date, occurrence cells merged into the aggregates)
+        self._next_rule_id = 1  # like _next_id: removed rules' ids are not handed out again
+        # snapshot mode writes synchronously unless the caller supplies its own saver
+        self.on_snapshot_save = on_snapshot_save or self.save
+        if storage_mode == "sqlite":
+            self.storage = SQLiteLedger(db_file, json_path=data_file)
+        elif storage_mode == "journal":
+            self.storage = TransactionJournal(data_file)
+        else:
+            self.storage = None
+
+    # --- Load/Save ---
+    @instrumented("ledger.read")
+    def read(self):
+        # Safe to run on a worker thread; apply() installs the result
+        payload = {}
+        if self.storage is not None:
+            payload = self.storage.load()
+        elif os.path.exists(self.data_file):
+            with open(self.data_file, 'r', encoding='utf-8') as f:
+                payload = json.load(f, object_hook=transaction_hook)
+        # the sqlite backend hands back itself as the store; files give a list
+        txs = payload.get('transactions', [])
+        store = TransactionColumns(txs) if isinstance(txs, list) else txs
+        return payload, store, store.aggregate_cells()
+
+    @instrumented("ledger.apply")
+    def apply(self, result):
+        payload, self.transactions, cells = result
+        self.merge_categories(payload.get('categories'))
+        self.budget_limits = payload.get('budget_limits', {})
+        self.budget_history = payload.get('budget_history') or {}
+        self.aggregates.load_cells(cells)
+        self.recurring = {r['id']: RecurringRule.from_dict(r) for r in payload.get('recurring') or []}
+        self._next_rule_id = max(payload.get('next_rule_id') or 1, max(self.recurring, default=0) + 1)
+        self._recurring_cells = None
+        self.sync_recurring()
+        # files written before the counter was persisted fall back to the largest id
+        self._next_id = max(payload.get('next_id') or 1, self.transactions.max_id() + 1)
+
+    def load(self):
+        self.apply(self.read())
+        return self
+
+    @instrumented("ledger.snapshot_payload")
+    def snapshot_payload(self, frozen=False):
+        # frozen=True leaves 'transactions' as a copy of the store, turned into
+        # dicts by whoever writes it (the journal's compactor thread)
+        return {
+            'transactions': self.transactions.snapshot() if frozen else self.transactions.to_records(),
+            'categories': list(self.categories),
+            'budget_limits': dict(self.budget_limits),
+            'budget_history': {c: dict(months) for c, months in self.budget_history.items()},
+            'next_id': self._next_id,
+            'recurring': [rule.to_dict() for rule in self.recurring.values()],
+            'next_rule_id': self._next_rule_id,
+            'last_updated': datetime.now().isoformat()
+        }
+
+    @instrumented("ledger.write_snapshot")
+    def write_snapshot(self, payload):
+        tmp = self.data_file + ".tmp"
+        with open(tmp, 'w', encoding='utf-8') as f:
+            json.dump(payload, f, ensure_ascii=False, indent=2)
+        os.replace(tmp, self.data_file)
+
+    def save(self):
+        self.write_snapshot(self.snapshot_payload())
+
+    @instrumented("ledger.record")
+    def record(self, op, data):
+        # Journal and sqlite modes write just this change; the journal's snapshot
+        # is compacted in the background
+        if self.storage is None:
+            self.on_snapshot_save()
+            return
+        self.storage.record(op, data)
+        # a failed compaction is reported once the change itself is written; its
+        # records are still pending, so the compaction below retries it
+        error, self.storage.error = self.storage.error, None
+        if self.storage.needs_compaction():
+            self.storage.compact(self.snapshot_payload(frozen=True))
+        if error is not None:
+            raise error
+
+    def close(self):
+        if self.storage is not None:
+            self.storage.close()
+
+    # --- Queries ---
+    def allocate_ids(self, count=1):
+        # Returns the first of count fresh ids
+        first = self._next_id
+        self._next_id += count
+        return first
+
+    def get(self, tx_id):
+        return self.transactions.get(tx_id)
+
+    def _store_filters(self, search, category, tx_type, month):
+        # UI-style filter values ("All", "") to the stores' None-means-any form
+        return {'search': search.lower(),
+                'category': None if category == "All" else category,
+                'tx_type': None if tx_type == "All" else tx_type,
+                'month': month}
+
+    def filter_indices(self, search="", category="All", tx_type="All", month="", sort=None):
+        # Keys into self.transactions (slots, or ids for the sqlite store), in
+        # ascending order of the sort column (id, date, type, category, amount, description)
+        return self.transactions.filter_indices(**self._store_filters(search, category, tx_type, month), sort=sort)
+
+    def view_keys(self, search="", category="All", tx_type="All", month="", sort=None):
+        # filter_indices() with the recurring occurrences in the filtered range
+        # merged in at their sort position (after equal keys, at the end in id
+        # order). Returns (keys, occurrences); key -1 - j stands for occurrences[j]
+        keys = self.filter_indices(search, category, tx_type, month, sort)
+        extra = list(self.recurring_occurrences(search, category, tx_type, month))
+        if not extra:
+            return keys, extra
+        if sort in (None, 'id'):
+            at = [len(keys)] * len(extra)
+        else:
+            # few occurrences, so each is bisected into the stored order
+            key, rows = OCCURRENCE_SORT_KEYS[sort], self.transactions
+            extra.sort(key=key)
+            at = [bisect.bisect_right(keys, key(tx), key=lambda i: key(rows[i])) for tx in extra]
+        return np.insert(np.asarray(keys, dtype=np.int64), at, -1 - np.arange(len(extra))), extra
+
+    def filter_transactions(self, search="", category="All", tx_type="All", month="", sort=None, descending=False):
+        # Stored rows plus the recurring occurrences (id None) in the filtered range
+        keys, extra = self.view_keys(search, category, tx_type, month, sort)
+        rows = [extra[-1 - i] if i < 0 else self.transactions[i] for i in (keys.tolist() if extra else keys)]
+        return rows[::-1] if descending else rows
+
+    def recurring_occurrences(self, search="", category="All", tx_type="All", month="", today=None):
+        # Occurrences up to today passing the history filters, generated only
+        # for the month filter's range (or each rule's whole run without one)
+        today = today or date.today()
+        search = search.lower()
+        rules = [r for r in self.recurring.values()
+                 if (category == "All" or r.category == category) and (tx_type == "All" or r.type == tx_type)
+                 and (not search or search in r.description.lower() or search in r.category.lower())]
+        first, last = (month and month_bounds(month)) or (date.min, today)
+        for tx in iter_occurrences(rules, first, min(last, today)):
+            if tx.date.startswith(month):
+                yield tx
+
+    def overview(self, month=None):
+        self.sync_recurring()
+        agg = self.aggregates
+        month = month or datetime.now().strftime("%Y-%m")
+        total_income = agg.total('Income')
+        return {
+            'month': month,
+            'total_income': total_income,
+            'total_expenses': agg.total('Expense'),
+            'balance': total_income - agg.total('Expense'),
+            # the overview counts anything that is not Income as spending
+            'net_balance': total_income - sum(agg.total(t) for t in agg.by_type if t != 'Income'),
+            'month_income': agg.month_total(month, 'Income'),
+            'month_expenses': agg.month_total(month, 'Expense'),
+            'count': agg.count(),
+            'income_count': agg.count('Income'),
+            'expense_count': agg.count('Expense'),
+        }
+
+    def budget_months(self):
+        # Months the budget view can show: every month with data plus this and
+        # next month (to plan ahead), newest first
+        now = datetime.now()
+        next_month = f"{now.year + now.month // 12}-{now.month % 12 + 1:02d}"
+        return sorted(set(self.aggregates.months()) | {now.strftime("%Y-%m"), next_month}, reverse=True)
+
+    def budget_for(self, month):
+        return effective_budgets(self.budget_limits, self.budget_history, month)
+
+    def forecast(self, month=None, today=None):
+        # category -> (spent, projected end-of-month spend), from the monthly rollup
+        month = month or datetime.now().strftime("%Y-%m")
+        self.sync_recurring()
+        if self._spend is None or self._spend[0] != self.aggregates.version:
+            # recurring spend is known in advance, so it stays out of the run-rate
+            self._spend = (self.aggregates.version, SpendMatrix(self.aggregates, self._recurring_cells[1]))
+        matrix = self._spend[1]
+        spent, projected = matrix.forecast(month, today)
+        result = {c: (s, p) for c, s, p in zip(matrix.categories, spent.tolist(), projected.tolist())}
+        # and is added back: what has occurred to spent, the whole month's schedule to the projection
+        first, last = month_bounds(month)
+        done = occurrence_cells(self.recurring.values(), first, min(last, today or date.today()))
+        for (_, tx_type, category), (total, _) in occurrence_cells(self.recurring.values(), first, last).items():
+            if tx_type == 'Expense':
+                s, p = result.get(category, (0.0, 0.0))
+                result[category] = (s + done.get((month, tx_type, category), (0,))[0] / 100, p + total / 100)
+        return result
+
+    def budget_status(self, month=None):
+        # Returns (rows, alerts); rows are (category, limit, spent, remaining, status, forecast).
+        # Spend comes from the (month, type, category) rollup, so any month costs O(budgets)
+        month = month or datetime.now().strftime("%Y-%m")
+        projections = self.forecast(month)
+        rows, alerts = [], []
+        for category, budget_limit in self.budget_for(month).items():
+            spent = self.aggregates.spent(month, category)
+            projected = projections.get(category, (spent, spent))[1]
+            remaining = budget_limit - spent
+            status = "Within Budget" if remaining >= 0 else "Over Budget"
+            rows.append((category, budget_limit, spent, remaining, status, projected))
+            if remaining < 0:
+                alerts.append(f"⚠️ OVER BUDGET: {category} exceeded by {-remaining:.2f}")
+            elif remaining < budget_limit * 0.2:  # Less than 20% remaining
+                alerts.append(f"🔔 WARNING: {category} has only {remaining:.2f} remaining")
+            elif projected > budget_limit + 0.005:
+                alerts.append(f"📈 FORECAST: {category} is on track to exceed by {projected - budget_limit:.2f}")
+        if not alerts:
+            alerts.append("✅ All budgets are within limits")
+        return rows, alerts
+
+    # --- Recurring ---
+    def sync_recurring(self, today=None, force=False):
+        # Keeps every rule occurrence up to today in the aggregates as per-month
+        # cells: O(rules x months), redone only when the rules or the date change
+        today = today or date.today()
+        if self._recurring_cells is not None:
+            if self._recurring_cells[0] == today and not force:
+                return
+            self.aggregates.add_cells(self._recurring_cells[1], -1)
+        cells = occurrence_cells(self.recurring.values(), date.min, today)
+        self.aggregates.add_cells(cells)
+        self._recurring_cells = (today, cells)
+
+    def add_recurring(self, amount, tx_type, category, description, start, frequency="monthly", interval=1,
+                      day=None, end=""):
+        # Validated like add_transaction; monthly rules default to start's day of
+        # the month and first occur on the first such day on or after start
+        tx = self.new_transaction(amount, tx_type, category, description, start)
+        if frequency not in FREQUENCIES:
+            raise ValueError("Repeat must be monthly or weekly.")
+        try:
+            interval = int(interval)
+            if interval < 1: raise ValueError
+        except (TypeError, ValueError):
+            raise ValueError("Repeat interval must be a whole number of at least 1.") from None
+        if frequency == 'monthly':
+            try:
+                day = int(day or tx.date[8:])
+                if not 1 <= day <= 31: raise ValueError
+            except (TypeError, ValueError):
+                raise ValueError("Day of month must be between 1 and 31.") from None
+        else:
+            day = None
+        end = (end or "").strip()
+        if end:
+            try:
+                end = datetime.strptime(end, "%Y-%m-%d").strftime("%Y-%m-%d")
+            except ValueError:
+                raise ValueError("End date must be in YYYY-MM-DD format.") from None
+            if end < tx.date:
+                raise ValueError("End date can't be before the start date.")
+        rule = RecurringRule(self._next_rule_id, tx.type, tx.category, tx.cents, tx.description,
+                             frequency, interval, day, tx.date, end or None)
+        self._next_rule_id += 1
+        self.recurring[rule.id] = rule
+        self._recurring_changed()
+        return rule
+
+    def remove_recurring(self, rule_id):
+        if self.recurring.pop(rule_id, None) is None:
+            return False
+        self._recurring_changed()
+        return True
+
+    def _recurring_changed(self):
+        self.sync_recurring(force=True)
+        self.record('recurring', {'rules': [rule.to_dict() for rule in self.recurring.values()],
+                                  'next_id': self._next_rule_id})
+
+    # --- Mutations ---
+    def new_transaction(self, amount, tx_type, category, description, date_str):
+        # Validated record without an id, for add_transactions(); callers such as
+        # the HTTP API pass values straight from JSON, so types are checked too
+        amount = str(amount).strip()
+        if not amount:
+            raise ValueError("Amount is required.")
+        try:
+            amt = float(amount)
+            if not 0 < amt < float('inf'): raise ValueError
+        except ValueError:
+            raise ValueError("Please enter a valid positive number for amount.") from None
+        if tx_type not in TRANSACTION_TYPES:
+            raise ValueError("Type must be Income or Expense.")
+        if description is None:
+            description = ""
+        if not all(isinstance(v, str) for v in (category or "", description, date_str)):
+            raise ValueError("Category, description and date must be text.")
+        try:
+            date_str = datetime.strptime(date_str.strip(), "%Y-%m-%d").strftime("%Y-%m-%d")
+        except ValueError:
+            raise ValueError("Date must be in YYYY-MM-DD format.") from None
+        return Transaction.create(None, date_str, tx_type, category or 'Other', amt, description.strip())
+
+    def add_transaction(self, amount, tx_type, category, description, date_str):
+        return self.add_transactions([self.new_transaction(amount, tx_type, category, description, date_str)])[0]
+
+    def add_transactions(self, batch):
+        # Gives each record a fresh id and commits the batch as one storage write;
+        # returns the stored records
+        next_id = self.allocate_ids(len(batch))
+        batch = [tx._replace(id=tx_id) for tx_id, tx in enumerate(batch, next_id)]
+        if batch:
+            self.transactions.extend(batch)
+            for tx in batch:
+                self.aggregates.add(tx)
+            self.record('add', [tx.to_dict() for tx in batch])
+        return batch
+
+    def delete(self, ids):
+        ids = list(ids)
+        removed = self.transactions.remove_ids(ids)
+        for tx in removed:
+            self.aggregates.remove(tx)
+        self.record('delete', ids)
+        return len(removed)
+
+    def add_category(self, name):
+        name = name.strip()
+        if not name:
+            raise ValueError("Category name can't be empty.")
+        if name in self.categories:
+            return False
+        self.categories.append(name)
+        self.record('categories', self.categories)
+        return True
+
+    def remove_category(self, name):
+        if name in DEFAULT_CATEGORIES:
+            raise ValueError("Default categories cannot be removed.")
+        if name not in self.categories:
+            return False
+        self.categories.remove(name)
+        self.record('categories', self.categories)
+        return True
+
+    def merge_categories(self, file_cats):
+        if not isinstance(file_cats, list):
+            return False
+        for c in file_cats:
+            if c not in self.categories:
+                self.categories.append(c)
+        return True
+
+    def set_budget(self, category, amount, month=None):
+        # The limit applies from month (default: this month) until a later entry
+        if not category:
+            raise ValueError("Please select a category.")
+        amount = str(amount).strip()
+        if not amount:
+            raise ValueError("Please enter a budget amount.")
+        try:
+            value = float(amount)
+            if value <= 0: raise ValueError
+        except ValueError:
+            raise ValueError("Please enter a valid positive number for budget.") from None
+        month = month or datetime.now().strftime("%Y-%m")
+        self.budget_history.setdefault(category, {})[month] = value
+        self.record('budget_history', {category: {month: value}})
+        return value
+
+    # --- Import/Export ---
+    def iter_import(self, path, extras, batch_size=IMPORT_BATCH):
+        # Yields (batch, fraction_read) of normalised records without ids;
+        # non-transaction members of the payload are collected into extras
+        with open(path, 'r', encoding='utf-8') as f:
+            size = max(1, os.fstat(f.fileno()).st_size)
+            reader = JsonStreamReader(f)
+            today = datetime.now().strftime('%Y-%m-%d')
+            batch = []
+            for key, tx in reader.members('transactions'):
+                if key != 'transactions':
+                    extras[key] = tx
+                    continue
+                if not isinstance(tx, dict):
+                    raise ValueError('Invalid format')
+                batch.append(self.normalize_import(tx, today))
+                if len(batch) >= batch_size:
+                    yield batch, reader.chars_read / size
+                    batch = []
+            yield batch, 1.0
+
+    def normalize_import(self, tx, today):
+        # Import files are taken as they come: text fields become strings, a
+        # missing, unreadable or non-finite amount becomes 0 and a missing date
+        # today. A date that doesn't parse is kept as written; the store files it
+        # under no month rather than this one
+        try:
+            amt = float(tx.get('amount', 0))
+            if not math.isfinite(amt): raise ValueError
+        except:
+            amt = 0.0
+        text = lambda key, default: default if tx.get(key) in (None, "") else str(tx[key])
+        date_str = text('date', today)
+        try:
+            date_str = datetime.strptime(date_str, "%Y-%m-%d").strftime("%Y-%m-%d")
+        except ValueError:
+            pass
+        # id is assigned by add_transactions
+        return Transaction.create(None, date_str, text('type', 'Expense'), text('category', 'Other'), amt,
+                                  text('description', ''))
+
+    def commit_import(self, batch):
+        return len(self.add_transactions(batch))
+
+    def finish_import(self, extras):
+        # Returns True when the category list changed
+        changed = self.merge_categories(extras.get('categories'))
+        if changed:
+            self.record('categories', self.categories)
+        file_budgets = extras.get('budget_limits', {})
+        if file_budgets:
+            self.budget_limits.update(file_budgets)
+            self.record('budget', file_budgets)
+        return changed
+
+    def import_json(self, path):
+        extras, count = {}, 0
+        for batch, _ in self.iter_import(path, extras):
+            count += self.commit_import(batch)
+        self.finish_import(extras)
+        return count
+
+    def statement_mapping(self):
+        if not os.path.exists(STATEMENT_MAPPING_FILE):
+            return {}
+        with open(STATEMENT_MAPPING_FILE, 'r', encoding='utf-8') as f:
+            return json.load(f)
+
+    def read_statement(self, path, snapshot, mapping=None, cancelled=None, workers=None):
+        # Safe on a worker thread: parses the bank CSV/OFX across a process pool
+        # and drops rows already in snapshot (same date, amount and description).
+        # Returns (new transactions without ids, duplicates skipped, unparseable rows)
+        parsed, errors = parse_statement(path, mapping, cancelled, workers)
+        fresh, skipped = dedupe(parsed, existing_keys(snapshot.csv_chunks(EXPORT_CHUNK)))
+        return fresh, skipped, errors
+
+    def commit_statement(self, fresh):
+        # One batch into the store, one storage write
+        count = self.commit_import(fresh)
+        new_categories = list(dict.fromkeys(tx.category for tx in fresh if tx.category not in self.categories))
+        if new_categories:
+            self.finish_import({'categories': new_categories})
+        return count
+
+    def import_statement(self, path, mapping=None, workers=None):
+        fresh, skipped, errors = self.read_statement(path, self.export_snapshot(), mapping, workers=workers)
+        return self.commit_statement(fresh), skipped, errors
+
+    def export_snapshot(self, search="", category="All", tx_type="All", month=""):
+        # Frozen copy of the rows passing the filters (all of them by default),
+        # safe to hand to write_csv() on a worker thread
+        return self.transactions.snapshot(**self._store_filters(search, category, tx_type, month))
+
+    def write_csv(self, path, snapshot, cancelled=None, compress=None):
+        return write_csv(path, snapshot.csv_chunks(EXPORT_CHUNK), cancelled, compress)
+
+    def export_csv(self, path, search="", category="All", tx_type="All", month="", compress=None):
+        return self.write_csv(path, self.export_snapshot(search, category, tx_type, month), compress=compress)
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Personal Wallet without the GUI")
+    parser.add_argument('--storage', choices=['journal', 'snapshot', 'sqlite'], default=STORAGE_MODE)
+    parser.add_argument('--data-file', default=DATA_FILE)
+    parser.add_argument('--db-file', default=DB_FILE)
+    commands = parser.add_subparsers(dest='command', required=True)
+
+    export = commands.add_parser('export', help="write transactions to CSV (.gz compresses)")
+    export.add_argument('output')
+    export.add_argument('--search', default="")
+    export.add_argument('--category', default="All")
+    export.add_argument('--type', dest='tx_type', default="All")
+    export.add_argument('--month', default="")
+    export.add_argument('--gzip', action='store_true', default=None)
+
+    statement = commands.add_parser('import-statement', help="import a bank CSV or OFX statement")
+    statement.add_argument('statement')
+    statement.add_argument('--map', action='append', default=[], metavar='FIELD=COLUMN',
+                           help="CSV column mapping by header or 0-based number, e.g. --map date=0 --map amount=Value; "
+                                "an empty value unsets a column (--map amount= --map debit=Out --map credit=In)")
+    statement.add_argument('--workers', type=int)
+
+    budget = commands.add_parser('budget', help="show budget status for a month")
+    budget.add_argument('--month', type=month_arg, help="YYYY-MM, default the current month")
+
+    args = parser.parse_args(argv)
+    ledger = WalletLedger(args.storage, args.data_file, args.db_file).load()
+    try:
+        if args.command == 'export':
+            count = ledger.export_csv(args.output, args.search, args.category, args.tx_type, args.month,
+                                      compress=args.gzip)
+            print(f"Exported {count} transactions to {args.output}")
+        elif args.command == 'budget':
+            rows, alerts = ledger.budget_status(args.month)
+            for category, budget_limit, spent, remaining, status, projected in rows:
+                print(f"{category:<15}{budget_limit:>10.2f}{spent:>10.2f}{remaining:>10.2f}"
+                      f"{projected:>10.2f}  {status}")
+            print("\n".join(alerts))
+        elif args.command == 'import-statement':
+            mapping = ledger.statement_mapping()
+            for item in args.map:
+                field, _, value = item.partition('=')
+                if field in COLUMN_FIELDS:
+                    # a column number, a header name, or nothing to unset a default column
+                    value = int(value) if value.isdigit() else value or None
+                mapping[field] = value
+            added, skipped, errors = ledger.import_statement(args.statement, mapping, args.workers)
+            print(f"Imported {added} transactions ({skipped} duplicates, {errors} unreadable rows)")
+    finally:
+        ledger.close()
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,36 @@
+import csv
+import gzip
+import os
+
+CSV_HEADER = ['ID', 'Date', 'Type', 'Category', 'Amount', 'Description']
+EXPORT_CHUNK = 50000  # rows formatted and handed to csv.writer at a time
+WRITE_BUFFER = 1 << 20
+GZIP_LEVEL = 6
+
+
+def open_output(path, compress=None):
+    # compress=None picks gzip from a .gz suffix
+    if compress is None:
+        compress = path.endswith('.gz')
+    if compress:
+        return gzip.open(path, 'wt', encoding='utf-8', newline='', compresslevel=GZIP_LEVEL)
+    return open(path, 'w', encoding='utf-8', newline='', buffering=WRITE_BUFFER)
+
+
+def write_csv(path, chunks, cancelled=None, compress=None):
+    # chunks yields lists of (id, date, type, category, amount, description)
+    # tuples with the amount already formatted; returns the rows written
+    count, stopped = 0, False
+    with open_output(path, compress) as f:
+        writer = csv.writer(f)
+        writer.writerow(CSV_HEADER)
+        for chunk in chunks:
+            if cancelled is not None and cancelled():
+                stopped = True
+                break
+            writer.writerows(chunk)
+            count += len(chunk)
+    if stopped:
+        # a cancelled export leaves no truncated file behind
+        os.remove(path)
+    return count
@@ -0,0 +1,99 @@
+import calendar
+import re
+from datetime import date
+
+import numpy as np
+
+BASELINE_MONTHS = 12  # completed months averaged for the expected spend
+SEASON_YEARS = 3      # past years the same calendar month is compared over
+
+
+MONTH_KEY = re.compile(r'\d{4}-\d{2}')
+
+
+def month_number(month):
+    # 'YYYY-MM' -> months since year 0, so month arithmetic is integer arithmetic
+    return int(month[:4]) * 12 + int(month[5:7]) - 1
+
+
+class SpendMatrix:
+    # Expense rollup as a categories x months array, built from the aggregate
+    # cells (O(cells), never the raw transactions); cells in exclude (same
+    # keys, [total, count]) are taken out first
+    def __init__(self, aggregates, exclude=None):
+        exclude = exclude or {}
+        months, rows, totals = {}, {}, []
+        month_codes, row_codes = [], []
+        for (month, tx_type, category), cell in aggregates.cells.items():
+            if tx_type != 'Expense' or not MONTH_KEY.fullmatch(month):
+                # rows with an unparsed date have no month to place them in
+                continue
+            month_codes.append(months.setdefault(month, len(months)))
+            row_codes.append(rows.setdefault(category, len(rows)))
+            totals.append((cell[0] - exclude.get((month, tx_type, category), (0,))[0]) / 100)
+        numbers = np.array([month_number(m) for m in months], dtype=np.int64)
+        self.first = int(numbers.min()) if len(numbers) else 0
+        width = int(numbers.max()) - self.first + 1 if len(numbers) else 1
+        self.categories = sorted(rows)
+        self.rows = {c: i for i, c in enumerate(self.categories)}
+        order = np.array([self.rows[c] for c in rows], dtype=np.int64)
+        self.spend = np.zeros((len(self.categories), width))
+        if totals:
+            np.add.at(self.spend, (order[row_codes], numbers[month_codes] - self.first), totals)
+        # each category's first month with spend; 0 for a category with none
+        self.starts = np.argmax(self.spend > 0, axis=1)
+
+    def column(self, col):
+        if 0 <= col < self.spend.shape[1]:
+            return self.spend[:, col]
+        return np.zeros(len(self.categories))
+
+    def window_mean(self, start, stop):
+        # mean spend over months [start, stop), months outside the data count as zero
+        width = stop - start
+        lo, hi = max(start, 0), min(stop, self.spend.shape[1])
+        if width <= 0 or hi <= lo:
+            return np.zeros(len(self.categories))
+        return self.spend[:, lo:hi].sum(axis=1) / width
+
+    def forecast(self, month, today=None):
+        # (spent, forecast) arrays over self.categories for the end of month.
+        # Remaining spend blends the month's own run-rate with the trailing
+        # average scaled by how this calendar month compared in past years.
+        today = today or date.today()
+        year, mon = int(month[:4]), int(month[5:7])
+        days = calendar.monthrange(year, mon)[1]
+        if (year, mon) < (today.year, today.month):
+            fraction = 1.0
+        elif (year, mon) == (today.year, today.month):
+            fraction = today.day / days
+        else:
+            fraction = 0.0
+        col = month_number(month) - self.first
+        spent = self.column(col)
+
+        start = max(0, min(col, self.spend.shape[1]) - BASELINE_MONTHS)
+        history = min(col, self.spend.shape[1]) - start
+        baseline = self.window_mean(start, start + history) if history > 0 else np.zeros(len(self.categories))
+
+        ratios = []
+        for years in range(1, SEASON_YEARS + 1):
+            past = col - 12 * years
+            if past - 11 < 0:
+                break
+            # a year only counts when its whole 12-month window is inside the
+            # category's history; months before it would read as zero spend
+            inside = (past - 11 >= self.starts) & (past < self.spend.shape[1])
+            year_mean = self.window_mean(past - 11, past + 1)
+            with np.errstate(divide='ignore', invalid='ignore'):
+                ratios.append(np.where(inside & (year_mean > 0), self.column(past) / year_mean, np.nan))
+        season = np.ones(len(self.categories))
+        if ratios:
+            stacked = np.vstack(ratios)
+            seen = ~np.isnan(stacked).all(axis=0)
+            season[seen] = np.nanmean(stacked[:, seen], axis=0)
+
+        expected = baseline * season
+        run_rate = spent / fraction if fraction else expected
+        remaining = (1 - fraction) * (fraction * run_rate + (1 - fraction) * expected)
+        return spent, spent + remaining
@@ -0,0 +1,147 @@
+import json
+import os
+import threading
+from datetime import datetime
+
+from records import Transaction, transaction_hook
+
+COMPACT_EVERY = 500  # journal records before the snapshot is rewritten in the background
+
+
+def apply_record(state, rec):
+    # state['transactions'] is a dict id -> tx while replaying so deletes stay O(1)
+    op, data = rec['op'], rec['data']
+    if op == 'add':
+        for tx in map(Transaction.from_dict, data):
+            state['transactions'][tx.id] = tx
+            state['next_id'] = max(state['next_id'] or 0, tx.id + 1)
+    elif op == 'delete':
+        for tx_id in data:
+            state['transactions'].pop(tx_id, None)
+    elif op == 'budget':
+        state['budget_limits'].update(data)
+    elif op == 'budget_history':
+        for category, months in data.items():
+            state['budget_history'].setdefault(category, {}).update(months)
+    elif op == 'categories':
+        state['categories'] = list(data)
+    elif op == 'recurring':
+        state['recurring'] = list(data['rules'])
+        state['next_rule_id'] = data['next_id']
+
+
+class TransactionJournal:
+    def __init__(self, snapshot_path, journal_path=None, compact_every=COMPACT_EVERY):
+        self.snapshot_path = snapshot_path
+        self.journal_path = journal_path or os.path.splitext(snapshot_path)[0] + ".journal"
+        self.compact_every = compact_every
+        self.error = None
+        self._lock = threading.Lock()
+        self._file = None
+        self._seq = 0
+        self._pending = 0
+        self._compactor = None
+
+    # --- Replay ---
+    def load(self):
+        payload = {}
+        if os.path.exists(self.snapshot_path):
+            with open(self.snapshot_path, 'r', encoding='utf-8') as f:
+                payload = json.load(f, object_hook=transaction_hook)
+        state = {
+            'transactions': {tx.id: tx for tx in payload.get('transactions', [])},
+            'categories': payload.get('categories'),
+            'budget_limits': dict(payload.get('budget_limits', {})),
+            'budget_history': {c: dict(m) for c, m in payload.get('budget_history', {}).items()},
+            'next_id': payload.get('next_id'),
+            'recurring': payload.get('recurring') or [],
+            'next_rule_id': payload.get('next_rule_id'),
+        }
+        snap_seq = payload.get('journal_seq', 0)
+        self._seq, self._pending = snap_seq, 0
+        for rec in self._read_records():
+            if rec['seq'] <= snap_seq:
+                continue
+            apply_record(state, rec)
+            self._seq = rec['seq']
+            self._pending += 1
+        state['transactions'] = list(state['transactions'].values())
+        return state
+
+    def _read_records(self):
+        if not os.path.exists(self.journal_path):
+            return
+        with open(self.journal_path, 'r', encoding='utf-8') as f:
+            for line in f:
+                try:
+                    yield json.loads(line)
+                except ValueError:
+                    # torn tail from an interrupted write; nothing after it was committed
+                    return
+
+    # --- Record ---
+    def record(self, op, data):
+        with self._lock:
+            self._seq += 1
+            if self._file is None:
+                self._file = open(self.journal_path, 'a', encoding='utf-8')
+            self._file.write(json.dumps({'seq': self._seq, 'op': op, 'data': data}, ensure_ascii=False) + "\n")
+            self._file.flush()
+            self._pending += 1
+
+    def needs_compaction(self):
+        return self._pending >= self.compact_every and not self.compacting()
+
+    def compacting(self):
+        return self._compactor is not None and self._compactor.is_alive()
+
+    # --- Compaction ---
+    def compact(self, payload, wait=False):
+        # payload must already be a copy of the state as of the last record();
+        # its 'transactions' may be a frozen store, made into dicts on the compactor thread
+        if self.compacting():
+            return False
+        with self._lock:
+            seq = self._seq
+        self._compactor = threading.Thread(target=self._compact, args=(payload, seq), daemon=True)
+        self._compactor.start()
+        if wait:
+            self._compactor.join()
+        return True
+
+    def _compact(self, payload, seq):
+        try:
+            transactions = payload['transactions']
+            if not isinstance(transactions, list):
+                transactions = transactions.to_records()
+            payload = dict(payload, transactions=transactions, journal_seq=seq,
+                           last_updated=datetime.now().isoformat())
+            tmp = self.snapshot_path + ".tmp"
+            with open(tmp, 'w', encoding='utf-8') as f:
+                json.dump(payload, f, ensure_ascii=False, indent=2)
+                f.flush()
+                os.fsync(f.fileno())
+            os.replace(tmp, self.snapshot_path)
+
+            # Drop the records the snapshot now covers; keep anything appended meanwhile
+            with self._lock:
+                if self._file is not None:
+                    self._file.close()
+                    self._file = None
+                kept = [rec for rec in self._read_records() if rec['seq'] > seq]
+                tmp = self.journal_path + ".tmp"
+                with open(tmp, 'w', encoding='utf-8') as f:
+                    for rec in kept:
+                        f.write(json.dumps(rec, ensure_ascii=False) + "\n")
+                os.replace(tmp, self.journal_path)
+                self._pending = len(kept)
+        except Exception as e:
+            self.error = e
+
+    def close(self):
+        if self._compactor is not None:
+            self._compactor.join()
+        with self._lock:
+            if self._file is not None:
+                self._file.close()
+                self._file = None
@@ -0,0 +1,98 @@
+import calendar
+import heapq
+import sys
+from collections import namedtuple
+from datetime import date, timedelta
+
+from records import Transaction, to_cents
+
+FREQUENCIES = ('monthly', 'weekly')
+
+
+class RecurringRule(namedtuple('RecurringRule', 'id type category cents description frequency interval day start end')):
+    # 'monthly': day `day` (clamped to short months) of every `interval`-th month;
+    # 'weekly': every `interval` weeks on start's weekday. start/end are ISO dates, end inclusive or None.
+    # Occurrences are never stored; occurrences() generates them for a date range
+    __slots__ = ()
+
+    @classmethod
+    def from_dict(cls, d):
+        return cls(d['id'], sys.intern(d['type']), sys.intern(d['category']), to_cents(d['amount']),
+                   d.get('description', ''), d.get('frequency', 'monthly'), int(d.get('interval') or 1),
+                   d.get('day'), d['start'], d.get('end'))
+
+    def to_dict(self):
+        return {'id': self.id, 'type': self.type, 'category': self.category, 'amount': self.cents / 100,
+                'description': self.description, 'frequency': self.frequency, 'interval': self.interval,
+                'day': self.day, 'start': self.start, 'end': self.end}
+
+    def describe(self):
+        if self.frequency == 'weekly':
+            return "weekly" if self.interval == 1 else f"every {self.interval} weeks"
+        every = "monthly" if self.interval == 1 else f"every {self.interval} months"
+        return f"{every} on day {self.day}"
+
+
+def _month_index(d):
+    return d.year * 12 + d.month - 1
+
+
+def occurrences(rule, first, last):
+    # Dates of rule within [first, last], in order, jumping straight to the
+    # first one in range: cost is O(occurrences in range), not O(history)
+    start = date.fromisoformat(rule.start)
+    if rule.end:
+        last = min(last, date.fromisoformat(rule.end))
+    first = max(first, start)
+    if first > last:
+        return
+    if rule.frequency == 'weekly':
+        step = 7 * rule.interval
+        current = start + timedelta(days=-(-(first - start).days // step) * step)
+        while current <= last:
+            yield current
+            current += timedelta(days=step)
+        return
+    index = _month_index(start)
+    index += -(-(_month_index(first) - index) // rule.interval) * rule.interval
+    while True:
+        year, month = divmod(index, 12)
+        current = date(year, month + 1, min(rule.day, calendar.monthrange(year, month + 1)[1]))
+        if current > last:
+            return
+        if current >= first:
+            yield current
+        index += rule.interval
+
+
+def iter_occurrences(rules, first, last):
+    # Transactions (id None) for every rule within [first, last], merged in date order
+    def expand(rule):
+        for day in occurrences(rule, first, last):
+            yield Transaction(None, sys.intern(day.isoformat()), rule.type, rule.category, rule.cents,
+                              rule.description)
+    return heapq.merge(*(expand(rule) for rule in rules), key=lambda tx: tx.date)
+
+
+def occurrence_cells(rules, first, last):
+    # {(month, type, category): [total cents, count]} for occurrences in [first, last]
+    cells = {}
+    for rule in rules:
+        for day in occurrences(rule, first, last):
+            cell = cells.setdefault((day.isoformat()[:7], rule.type, rule.category), [0, 0])
+            cell[0] += rule.cents
+            cell[1] += 1
+    return cells
+
+
+def month_bounds(prefix):
+    # 'YYYY' or 'YYYY-MM' (the history's month filter) -> (first, last) dates, else None
+    try:
+        if len(prefix) == 4:
+            return date(int(prefix), 1, 1), date(int(prefix), 12, 31)
+        if len(prefix) == 7:
+            year, month = int(prefix[:4]), int(prefix[5:7])
+            return date(year, month, 1), date(year, month, calendar.monthrange(year, month)[1])
+    except ValueError:
+        pass
+    return None
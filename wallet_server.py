@@ -0,0 +1,320 @@
+import argparse
+import asyncio
+import json
+import sys
+from urllib.parse import urlsplit, parse_qsl
+
+from wallet_core import WalletLedger, STORAGE_MODE, DATA_FILE, DB_FILE, parse_month
+
+# Local HTTP/JSON API over the same ledger files the Tk app uses. The server
+# owns those files while it runs, so start it instead of the app, not beside it.
+#   python wallet_server.py --port 8765
+#   GET    /transactions?search=&category=&type=&month=&sort=&descending=1&offset=0&limit=100
+#   POST   /transactions          {"amount": 4.5, "type": "Expense", "category": "Other",
+#                                  "description": "", "date": "YYYY-MM-DD"}  (or a list of them)
+#   DELETE /transactions/<id>
+#   POST   /transactions/delete   {"ids": [1, 2]}
+#   GET    /budget?month=YYYY-MM
+#   GET    /rollups?month=YYYY-MM&type=Expense
+#   GET    /overview?month=YYYY-MM
+HOST = "127.0.0.1"
+PORT = 8765
+PAGE_LIMIT = 1000        # transactions per response unless limit= says otherwise
+BATCH_WINDOW = 0.002     # seconds a write waits for others to share its commit
+MAX_BATCH = 5000         # queued writes applied in one commit
+READ_CACHE_SIZE = 512    # cached GET responses; the whole cache is dropped on every commit
+MAX_BODY = 16 << 20
+MAX_ID = (1 << 63) - 1   # ids are int64 in both stores
+REASONS = {200: "OK", 400: "Bad Request", 404: "Not Found", 405: "Method Not Allowed",
+           413: "Payload Too Large", 500: "Internal Server Error"}
+
+
+class HTTPError(Exception):
+    def __init__(self, status, message):
+        super().__init__(message)
+        self.status = status
+
+
+def _flag(value):
+    return value.lower() in ("1", "true", "yes")
+
+
+def _month(query):
+    # budget and overview months; the history's month filter stays a free prefix
+    try:
+        return parse_month(query['month']) if query.get('month') else None
+    except ValueError as e:
+        raise HTTPError(400, str(e)) from None
+
+
+def _int(query, name, default):
+    try:
+        return int(query.get(name, default))
+    except ValueError:
+        raise HTTPError(400, f"{name} must be an integer") from None
+
+
+class WalletServer:
+    # One asyncio task per connection; every ledger call happens on the event
+    # loop thread, so the ledger needs no locking. Writes go through a queue
+    # drained by a single writer task that applies each batch as one commit.
+    def __init__(self, ledger, batch_window=BATCH_WINDOW):
+        self.ledger = ledger
+        self.batch_window = batch_window
+        self._writes = None  # asyncio.Queue of (op, payload, future), made on the running loop
+        self._cache = {}     # (path, sorted query) -> encoded 200 response body
+        self.commits = 0     # grouped commits written, for logging
+
+    # --- Reads ---
+    def _transactions(self, query):
+        # Same filters and order as the app's _filter_transactions, one page at a time
+        ledger = self.ledger
+        sort = query.get('sort') or None
+        if sort is not None and sort not in ('id', 'date', 'type', 'category', 'amount', 'description'):
+            raise HTTPError(400, f"Unknown sort column '{sort}'")
+        # recurring occurrences are merged in as the app shows them, with id null
+        keys, extra = ledger.view_keys(query.get('search', ""), query.get('category', "All"),
+                                       query.get('type', "All"), query.get('month', ""), sort)
+        total = len(keys)
+        offset = max(0, _int(query, 'offset', 0))
+        stop = offset + max(0, _int(query, 'limit', PAGE_LIMIT))
+        if _flag(query.get('descending', "")):
+            page = keys[max(0, total - stop):max(0, total - offset)][::-1]
+        else:
+            page = keys[offset:stop]
+        return {'count': total, 'offset': offset,
+                'transactions': [(extra[-1 - i] if i < 0 else ledger.transactions[i]).to_dict() for i in page]}
+
+    def _budget(self, query):
+        rows, alerts = self.ledger.budget_status(_month(query))
+        return {'rows': [dict(zip(('category', 'limit', 'spent', 'remaining', 'status', 'forecast'), row))
+                         for row in rows],
+                'alerts': alerts}
+
+    def _rollups(self, query):
+        month, tx_type = query.get('month'), query.get('type')
+        cells = [{'month': m, 'type': t, 'category': c, 'total': cell[0] / 100, 'count': cell[1]}
+                 for (m, t, c), cell in self.ledger.aggregates.cells.items()
+                 if (not month or m == month) and (not tx_type or t == tx_type)]
+        cells.sort(key=lambda cell: (cell['month'], cell['type'], cell['category']))
+        return {'monthly': dict(sorted(self.ledger.aggregates.monthly_income_expenses().items())),
+                'cells': cells}
+
+    def _read(self, path, query):
+        if path == '/transactions':
+            return self._transactions(query)
+        if path == '/budget':
+            return self._budget(query)
+        if path == '/rollups':
+            return self._rollups(query)
+        if path == '/overview':
+            return self.ledger.overview(_month(query))
+        raise HTTPError(404, f"No such resource: {path}")
+
+    def get(self, path, query):
+        # Responses are cached until the next commit
+        key = (path, tuple(sorted(query.items())))
+        body = self._cache.get(key)
+        if body is None:
+            body = json.dumps(self._read(path, query), ensure_ascii=False).encode('utf-8')
+            if len(self._cache) >= READ_CACHE_SIZE:
+                self._cache.clear()
+            self._cache[key] = body
+        return body
+
+    # --- Writes ---
+    async def write(self, op, payload):
+        future = asyncio.get_running_loop().create_future()
+        await self._writes.put((op, payload, future))
+        return await future
+
+    async def _writer(self):
+        while True:
+            batch = [await self._writes.get()]
+            # let requests already in flight join this commit
+            await asyncio.sleep(self.batch_window)
+            while len(batch) < MAX_BATCH and not self._writes.empty():
+                batch.append(self._writes.get_nowait())
+            try:
+                self._commit(batch)
+            except Exception as e:
+                # _apply_run answers its own futures; anything left unanswered gets
+                # the error, and the writer keeps serving
+                for _, _, future in batch:
+                    if not future.done():
+                        future.set_exception(e)
+
+    def _commit(self, batch):
+        # Consecutive adds become one add_transactions() and consecutive deletes
+        # one delete(), so each run is a single storage write; order is kept
+        run_op, run = None, []
+        for item in batch + [(None, None, None)]:
+            op = item[0]
+            if op != run_op and run:
+                try:
+                    self._apply_run(run_op, run)
+                except Exception as e:
+                    for _, _, future in run:
+                        if not future.done():
+                            future.set_exception(e)
+                run = []
+            run_op = op
+            run.append(item)
+        self._cache.clear()
+
+    def _apply_run(self, op, run):
+        ledger = self.ledger
+        if op == 'add':
+            records, owners = [], []
+            for _, rows, future in run:
+                try:
+                    built = [ledger.new_transaction(r.get('amount', ""), r.get('type', "Expense"),
+                                                    r.get('category', "Other"), r.get('description', ""),
+                                                    r.get('date', "")) for r in rows]
+                except (ValueError, AttributeError, TypeError) as e:
+                    future.set_exception(HTTPError(400, str(e) or "Invalid transaction"))
+                    continue
+                owners.append((future, len(records), len(built)))
+                records += built
+            try:
+                stored = ledger.add_transactions(records)
+            except Exception as e:
+                for future, _, _ in owners:
+                    future.set_exception(e)
+                return
+            for future, start, count in owners:
+                future.set_result([tx.to_dict() for tx in stored[start:start + count]])
+        else:
+            ids = [tx_id for _, wanted, _ in run for tx_id in wanted]
+            try:
+                existing = {tx_id for tx_id in ids if ledger.get(tx_id) is not None}
+                ledger.delete(ids)
+            except Exception as e:
+                for _, _, future in run:
+                    future.set_exception(e)
+                return
+            for _, wanted, future in run:
+                future.set_result({'deleted': [tx_id for tx_id in wanted if tx_id in existing]})
+        self.commits += 1
+
+    # --- HTTP ---
+    async def route(self, method, path, query, body):
+        if path == '/transactions' and method == 'POST':
+            rows = body if isinstance(body, list) else [body]
+            if not rows or not all(isinstance(r, dict) for r in rows):
+                raise HTTPError(400, "Expected a transaction object or a list of them")
+            added = await self.write('add', rows)
+            return json.dumps(added if isinstance(body, list) else added[0], ensure_ascii=False).encode('utf-8')
+        if path == '/transactions/delete' and method == 'POST':
+            ids = body.get('ids') if isinstance(body, dict) else None
+            if not isinstance(ids, list) or not all(type(i) is int and 0 <= i <= MAX_ID for i in ids):
+                raise HTTPError(400, "Expected {\"ids\": [...]} of transaction ids")
+            return json.dumps(await self.write('delete', ids)).encode('utf-8')
+        if path.startswith('/transactions/') and method == 'DELETE':
+            try:
+                tx_id = int(path.rsplit('/', 1)[1])
+            except ValueError:
+                raise HTTPError(404, f"No such resource: {path}") from None
+            if not 0 <= tx_id <= MAX_ID:
+                raise HTTPError(400, f"Transaction id {tx_id} is out of range")
+            result = await self.write('delete', [tx_id])
+            if not result['deleted']:
+                raise HTTPError(404, f"Transaction {tx_id} not found")
+            return json.dumps(result).encode('utf-8')
+        if method != 'GET':
+            raise HTTPError(405, f"{method} not allowed on {path}")
+        return self.get(path, query)
+
+    async def handle(self, reader, writer):
+        # HTTP/1.1 with keep-alive; just enough of it for JSON clients
+        try:
+            while True:
+                request_line = await reader.readline()
+                if not request_line.strip():
+                    break
+                headers = {}
+                while True:
+                    line = await reader.readline()
+                    if line in (b"\r\n", b"\n", b""):
+                        break
+                    name, _, value = line.decode('latin-1').partition(':')
+                    headers[name.strip().lower()] = value.strip()
+                try:
+                    method, target, version = request_line.decode('latin-1').split()
+                except ValueError:
+                    break
+                keep_alive = (headers.get('connection', '').lower() != 'close'
+                              if version == 'HTTP/1.1' else headers.get('connection', '').lower() == 'keep-alive')
+                try:
+                    try:
+                        length = int(headers.get('content-length') or 0)
+                        if length < 0: raise ValueError
+                    except ValueError:
+                        keep_alive = False
+                        raise HTTPError(400, "Invalid Content-Length") from None
+                    if length > MAX_BODY:
+                        keep_alive = False
+                        raise HTTPError(413, "Request body too large")
+                    raw = await reader.readexactly(length) if length else b""
+                    url = urlsplit(target)
+                    try:
+                        body = json.loads(raw) if raw else None
+                    except ValueError:
+                        raise HTTPError(400, "Body is not valid JSON") from None
+                    status, payload = 200, await self.route(method, url.path.rstrip('/') or '/',
+                                                            dict(parse_qsl(url.query)), body)
+                except HTTPError as e:
+                    status, payload = e.status, json.dumps({'error': str(e)}).encode('utf-8')
+                except Exception as e:
+                    status, payload = 500, json.dumps({'error': str(e)}).encode('utf-8')
+                writer.write(f"HTTP/1.1 {status} {REASONS[status]}\r\n"
+                             f"Content-Type: application/json; charset=utf-8\r\n"
+                             f"Content-Length: {len(payload)}\r\n"
+                             f"Connection: {'keep-alive' if keep_alive else 'close'}\r\n\r\n".encode('latin-1')
+                             + payload)
+                await writer.drain()
+                if not keep_alive:
+                    break
+        except (asyncio.IncompleteReadError, ConnectionError):
+            pass
+        finally:
+            writer.close()
+
+    async def serve(self, host=HOST, port=PORT, ready=None):
+        self._writes = asyncio.Queue()
+        writer_task = asyncio.create_task(self._writer())
+        server = await asyncio.start_server(self.handle, host, port)
+        if ready is not None:
+            ready(server)
+        try:
+            async with server:
+                await server.serve_forever()
+        finally:
+            writer_task.cancel()
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Serve the wallet ledger as a local HTTP/JSON API")
+    parser.add_argument('--storage', choices=['journal', 'snapshot', 'sqlite'], default=STORAGE_MODE)
+    parser.add_argument('--data-file', default=DATA_FILE)
+    parser.add_argument('--db-file', default=DB_FILE)
+    parser.add_argument('--host', default=HOST)
+    parser.add_argument('--port', type=int, default=PORT)
+    args = parser.parse_args(argv)
+
+    ledger = WalletLedger(args.storage, args.data_file, args.db_file).load()
+    server = WalletServer(ledger)
+    ready = lambda s: print(f"Serving {len(ledger.transactions)} transactions on http://{args.host}:{args.port}")
+    try:
+        asyncio.run(server.serve(args.host, args.port, ready))
+    except KeyboardInterrupt:
+        pass
+    finally:
+        if ledger.storage is None:
+            ledger.save()
+        ledger.close()
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
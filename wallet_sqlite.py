@@ -0,0 +1,321 @@
+import json
+import os
+import sqlite3
+import sys
+from itertools import islice
+from urllib.request import pathname2url
+
+from wallet_journal import TransactionJournal
+from records import Transaction
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS transactions (
+    id INTEGER PRIMARY KEY,
+    date TEXT NOT NULL,
+    type TEXT NOT NULL,
+    category TEXT NOT NULL,
+    amount REAL NOT NULL,
+    description TEXT NOT NULL DEFAULT '',
+    search_text TEXT NOT NULL DEFAULT ''
+);
+CREATE INDEX IF NOT EXISTS idx_transactions_date ON transactions(date);
+CREATE INDEX IF NOT EXISTS idx_transactions_category ON transactions(category);
+CREATE INDEX IF NOT EXISTS idx_transactions_type ON transactions(type);
+CREATE INDEX IF NOT EXISTS idx_transactions_amount ON transactions(amount);
+
+CREATE TABLE IF NOT EXISTS rollups (
+    month TEXT NOT NULL,
+    type TEXT NOT NULL,
+    category TEXT NOT NULL,
+    total REAL NOT NULL,
+    count INTEGER NOT NULL,
+    PRIMARY KEY (month, type, category)
+);
+CREATE TRIGGER IF NOT EXISTS rollup_insert AFTER INSERT ON transactions BEGIN
+    INSERT INTO rollups VALUES (substr(NEW.date, 1, 7), NEW.type, NEW.category, NEW.amount, 1)
+    ON CONFLICT (month, type, category) DO UPDATE SET total = total + NEW.amount, count = count + 1;
+END;
+CREATE TRIGGER IF NOT EXISTS rollup_delete AFTER DELETE ON transactions BEGIN
+    UPDATE rollups SET total = total - OLD.amount, count = count - 1
+    WHERE month = substr(OLD.date, 1, 7) AND type = OLD.type AND category = OLD.category;
+    DELETE FROM rollups WHERE count <= 0;
+END;
+
+CREATE TABLE IF NOT EXISTS categories (position INTEGER PRIMARY KEY, name TEXT NOT NULL);
+CREATE TABLE IF NOT EXISTS budget_limits (category TEXT PRIMARY KEY, amount REAL NOT NULL);
+CREATE TABLE IF NOT EXISTS budget_history (
+    category TEXT NOT NULL,
+    month TEXT NOT NULL,
+    amount REAL NOT NULL,
+    PRIMARY KEY (category, month)
+);
+CREATE TABLE IF NOT EXISTS meta (key TEXT PRIMARY KEY, value TEXT);
+"""
+
+COLUMNS = "id, date, type, category, amount, description"
+# history column -> ORDER BY; search_text is the lower-cased description
+SORT_SQL = {'id': "id", 'date': "date, id", 'type': "type, id", 'category': "category, id",
+            'amount': "amount, id", 'description': "search_text, id"}
+# amounts stay REAL on disk (existing databases keep working); totals go out as cents
+ROLLUP_CELLS = "SELECT month, type, category, CAST(ROUND(total * 100) AS INTEGER), count FROM rollups"
+
+
+def _row(r):
+    return Transaction.create(r[0], r[1], r[2], r[3], r[4], r[5])
+
+
+def _filter_sql(conn, search=None, category=None, tx_type=None, month=None):
+    # WHERE clause (with leading space, or empty) and its arguments
+    where, args = [], []
+    if category is not None:
+        where.append("category = ?")
+        args.append(category)
+    if tx_type is not None:
+        where.append("type = ?")
+        args.append(tx_type)
+    if month:
+        # range on the date index; same result as str.startswith on ISO dates
+        where.append("date >= ? AND date < ?")
+        args += [month, month + "\U0010ffff"]
+    if search:
+        cats = [c for (c,) in conn.execute("SELECT DISTINCT category FROM rollups")
+                if search in c.lower()]
+        where.append(f"(instr(search_text, ?) > 0 OR category IN ({','.join('?' * len(cats))}))")
+        args += [search] + cats
+    return (" WHERE " + " AND ".join(where) if where else ""), args
+
+
+def _count(conn):
+    return conn.execute("SELECT COALESCE(SUM(count), 0) FROM rollups").fetchone()[0]
+
+
+def _settings(conn):
+    # everything load() returns besides the transactions
+    meta = dict(conn.execute("SELECT key, value FROM meta WHERE key IN ('next_id', 'recurring', 'next_rule_id')"))
+    history = {}
+    for category, month, amount in conn.execute("SELECT category, month, amount FROM budget_history"):
+        history.setdefault(category, {})[month] = amount
+    return {
+        'categories': [name for (name,) in conn.execute("SELECT name FROM categories ORDER BY position")] or None,
+        'budget_limits': dict(conn.execute("SELECT category, amount FROM budget_limits")),
+        'budget_history': history,
+        'next_id': int(meta.get('next_id') or 0) or None,
+        'recurring': json.loads(meta.get('recurring') or "[]"),
+        'next_rule_id': int(meta.get('next_rule_id') or 0) or None,
+    }
+
+
+def read_summary(db_path):
+    # load()'s settings plus the rollup cells and row count, read from an
+    # existing database opened read-only: nothing is created, migrated or
+    # switched to WAL, and no transaction row is touched
+    if not os.path.exists(db_path):
+        raise FileNotFoundError(f"No wallet database at {db_path}")
+    conn = sqlite3.connect(f"file:{pathname2url(os.path.abspath(db_path))}?mode=ro", uri=True)
+    try:
+        summary = _settings(conn)
+        summary['count'] = _count(conn)
+        summary['cells'] = conn.execute(ROLLUP_CELLS).fetchall()
+        return summary
+    finally:
+        conn.close()
+
+
+class SQLiteLedger:
+    # Storage backend and transaction store in one: rows live only in the
+    # database, filters run as SQL and rows are fetched by id on demand.
+    # Keys handed out by filter_indices() are transaction ids.
+    def __init__(self, db_path, json_path=None):
+        self.db_path = db_path
+        self.json_path = json_path
+        self.error = None
+        # load() runs on the I/O worker, everything after it on the Tk thread
+        self.conn = sqlite3.connect(db_path, check_same_thread=False)
+        self.conn.execute("PRAGMA journal_mode=WAL")
+        self.conn.execute("PRAGMA synchronous=NORMAL")
+        self.conn.executescript(SCHEMA)
+        self._count = 0
+
+    # --- Backend ---
+    def load(self):
+        if self.json_path and self._meta('migrated_from') is None:
+            # journal mode may not have compacted into a snapshot yet
+            journal = TransactionJournal(self.json_path)
+            if os.path.exists(journal.snapshot_path) or os.path.exists(journal.journal_path):
+                migrate_json(self.json_path, self)
+        self._count = _count(self.conn)
+        return dict(_settings(self.conn), transactions=self)
+
+    def record(self, op, data):
+        # add/delete were already written through extend()/remove_ids()
+        with self.conn:
+            self._write(op, data)
+
+    def _write(self, op, data):
+        # record() without its own transaction, so migrate_json() can group writes
+        if op == 'budget':
+            self.conn.executemany("INSERT OR REPLACE INTO budget_limits VALUES (?, ?)", data.items())
+        elif op == 'budget_history':
+            self.conn.executemany("INSERT OR REPLACE INTO budget_history VALUES (?, ?, ?)",
+                                  ((c, m, v) for c, months in data.items() for m, v in months.items()))
+        elif op == 'categories':
+            self.conn.execute("DELETE FROM categories")
+            self.conn.executemany("INSERT INTO categories VALUES (?, ?)", enumerate(data))
+        elif op == 'recurring':
+            # a handful of rules, kept whole like the category list
+            self.conn.executemany("INSERT OR REPLACE INTO meta VALUES (?, ?)",
+                                  [('recurring', json.dumps(data['rules'])), ('next_rule_id', data['next_id'])])
+
+    def needs_compaction(self):
+        return False
+
+    def close(self):
+        self.conn.close()
+
+    def _meta(self, key):
+        row = self.conn.execute("SELECT value FROM meta WHERE key = ?", (key,)).fetchone()
+        return row[0] if row else None
+
+    # --- Store ---
+    def append(self, tx):
+        self.extend((tx,))
+
+    def extend(self, transactions):
+        transactions = list(transactions)
+        if not transactions:
+            return
+        with self.conn:
+            self._count += self._insert(transactions)
+
+    def _insert(self, transactions):
+        # extend() without its own transaction; returns the rows written
+        cur = self.conn.executemany(
+            "INSERT INTO transactions VALUES (?, ?, ?, ?, ?, ?, ?)",
+            ((tx.id, tx.date, tx.type, tx.category, tx.amount, tx.description, tx.description.lower())
+             for tx in transactions))
+        if transactions:
+            self._keep_next_id(max(tx.id for tx in transactions) + 1)
+        return cur.rowcount
+
+    def _keep_next_id(self, next_id):
+        # ids are never reused, even once the newest row is deleted
+        self.conn.execute(
+            "INSERT INTO meta VALUES ('next_id', ?) ON CONFLICT (key) "
+            "DO UPDATE SET value = MAX(CAST(value AS INTEGER), CAST(excluded.value AS INTEGER))",
+            (next_id,))
+
+    def remove_ids(self, ids):
+        ids = list(ids)
+        removed = []
+        with self.conn:
+            for start in range(0, len(ids), 500):
+                chunk = ids[start:start + 500]
+                marks = ",".join("?" * len(chunk))
+                removed += [_row(r) for r in self.conn.execute(
+                    f"SELECT {COLUMNS} FROM transactions WHERE id IN ({marks})", chunk)]
+                self.conn.execute(f"DELETE FROM transactions WHERE id IN ({marks})", chunk)
+        self._count -= len(removed)
+        return removed
+
+    def __len__(self):
+        return self._count
+
+    def __getitem__(self, tx_id):
+        r = self.conn.execute(f"SELECT {COLUMNS} FROM transactions WHERE id = ?", (int(tx_id),)).fetchone()
+        if r is None:
+            raise KeyError(tx_id)
+        return _row(r)
+
+    def get(self, tx_id):
+        try:
+            return self[tx_id]
+        except KeyError:
+            return None
+
+    def __iter__(self):
+        for r in self.conn.execute(f"SELECT {COLUMNS} FROM transactions ORDER BY id"):
+            yield _row(r)
+
+    def to_records(self):
+        return [tx.to_dict() for tx in self]
+
+    def snapshot(self, **filters):
+        if any(filters.values()):
+            return SQLiteSnapshot(self.db_path, None, filters)
+        return SQLiteSnapshot(self.db_path, self._count)
+
+    def max_id(self):
+        return self.conn.execute("SELECT COALESCE(MAX(id), 0) FROM transactions").fetchone()[0]
+
+    def aggregate_cells(self):
+        return self.conn.execute(ROLLUP_CELLS).fetchall()
+
+    def filter_indices(self, search=None, category=None, tx_type=None, month=None, sort=None):
+        where, args = _filter_sql(self.conn, search, category, tx_type, month)
+        order = SORT_SQL[sort or 'id']
+        return [tx_id for (tx_id,) in self.conn.execute(f"SELECT id FROM transactions{where} ORDER BY {order}", args)]
+
+
+class SQLiteSnapshot:
+    # Reads the ledger (optionally filtered) on its own connection; WAL gives it
+    # a consistent view. count=None is counted on first use.
+    def __init__(self, db_path, count, filters=None):
+        self.db_path = db_path
+        self._count = count
+        self.filters = filters or {}
+
+    def _rows(self, columns):
+        conn = sqlite3.connect(self.db_path)
+        try:
+            where, args = _filter_sql(conn, **self.filters)
+            yield from conn.execute(f"SELECT {columns} FROM transactions{where} ORDER BY id", args)
+        finally:
+            conn.close()
+
+    def __len__(self):
+        if self._count is None:
+            self._count = list(self._rows("COUNT(*)"))[0][0]
+        return self._count
+
+    def __iter__(self):
+        for r in self._rows(COLUMNS):
+            yield _row(r)
+
+    def csv_chunks(self, chunk_size):
+        rows = self._rows(COLUMNS)
+        while True:
+            chunk = [(r[0], r[1], r[2], r[3], '%.2f' % r[4], r[5]) for r in islice(rows, chunk_size)]
+            if not chunk:
+                return
+            yield chunk
+
+
+def migrate_json(json_path, ledger):
+    # One-shot import of transactions.json (plus any pending journal records)
+    # in one transaction with its migrated_from marker, so an interrupted run
+    # leaves nothing behind and is simply redone on the next start
+    state = TransactionJournal(json_path).load()
+    with ledger.conn:
+        count = ledger._insert(state['transactions'])
+        if state['next_id']:
+            ledger._keep_next_id(state['next_id'])
+        for op, key in (('categories', 'categories'), ('budget', 'budget_limits'),
+                        ('budget_history', 'budget_history')):
+            if state[key]:
+                ledger._write(op, state[key])
+        if state['recurring']:
+            ledger._write('recurring', {'rules': state['recurring'], 'next_id': state['next_rule_id']
+                                        or max(r['id'] for r in state['recurring']) + 1})
+        ledger.conn.execute("INSERT OR REPLACE INTO meta VALUES ('migrated_from', ?)",
+                            (os.path.abspath(json_path),))
+    ledger._count += count
+    return count
+
+
+if __name__ == '__main__':
+    if len(sys.argv) != 3:
+        sys.exit("usage: python wallet_sqlite.py transactions.json transactions.db")
+    ledger = SQLiteLedger(sys.argv[2])
+    count = migrate_json(sys.argv[1], ledger)
+    ledger.close()
+    print(f"Migrated {count} transactions into {sys.argv[2]}")
@@ -0,0 +1,212 @@
+import csv
+import os
+import re
+from collections import Counter, deque
+from concurrent.futures import ProcessPoolExecutor
+from datetime import datetime
+from functools import partial
+from hashlib import blake2b
+from itertools import chain, islice
+from multiprocessing import get_context
+
+from records import Transaction
+
+STATEMENT_CHUNK = 20000  # statement rows parsed per worker task
+CSV_MAPPING = {
+    # header names (or 0-based column numbers) in the bank's CSV
+    'date': 'Date',
+    'amount': 'Amount',          # signed: negative is money out
+    'debit': None,               # or separate money-out / money-in columns
+    'credit': None,
+    'description': 'Description',
+    'type': None,
+    'category': None,
+    'date_format': '%Y-%m-%d',
+    'decimal': '.',
+    'delimiter': ',',
+    'encoding': 'utf-8-sig',
+    'default_category': 'Other',
+}
+# mapping fields that name a CSV column; the rest are parsing options
+COLUMN_FIELDS = ('date', 'amount', 'debit', 'credit', 'description', 'type', 'category')
+_OFX_TAG = re.compile(r'<(\w+)>([^<\r\n]*)')
+_NOT_NUMBER = re.compile(r'[^0-9.\-]')
+
+
+def statement_key(date_str, amount, description):
+    # Stable across processes (unlike hash()); amount is the 2-decimal string
+    text = f"{date_str}|{amount}|{description.strip()}"
+    return int.from_bytes(blake2b(text.encode('utf-8'), digest_size=8).digest(), 'little')
+
+
+def _amount(text, decimal):
+    text = text.strip()
+    negative = text.startswith('(') and text.endswith(')')
+    if decimal != '.':
+        text = text.replace('.', '').replace(decimal, '.')
+    value = float(_NOT_NUMBER.sub('', text))
+    return -value if negative else value
+
+
+def _tx(date_str, signed, description, tx_type=None, category=None, default_category='Other'):
+    amount = f"{abs(signed):.2f}"
+    tx = Transaction.create(None, date_str, tx_type or ('Income' if signed > 0 else 'Expense'),
+                            category or default_category, amount, description.strip())
+    return statement_key(date_str, amount, description), tx
+
+
+# --- Workers (run in the process pool) ---
+def parse_csv_rows(columns, mapping, rows):
+    # Returns ([(key, tx), ...], rows that could not be parsed)
+    parsed, errors = [], 0
+    date_col, amount_col, debit_col, credit_col, desc_col, type_col, cat_col = columns
+    dates = {}  # a statement has few distinct dates; strptime is the slow part
+    for row in rows:
+        try:
+            raw_date = row[date_col]
+            date_str = dates.get(raw_date)
+            if date_str is None:
+                date_str = dates[raw_date] = datetime.strptime(
+                    raw_date.strip(), mapping['date_format']).strftime('%Y-%m-%d')
+            if amount_col is not None:
+                signed = _amount(row[amount_col], mapping['decimal'])
+            else:
+                debit, credit = row[debit_col].strip(), row[credit_col].strip()
+                signed = (_amount(credit, mapping['decimal']) if credit else 0.0) - \
+                         (abs(_amount(debit, mapping['decimal'])) if debit else 0.0)
+            tx_type = None
+            if type_col is not None:
+                tx_type = 'Income' if row[type_col].strip().lower() in ('income', 'credit', 'cr') else 'Expense'
+            category = row[cat_col].strip() if cat_col is not None else None
+        except (ValueError, IndexError):
+            errors += 1
+            continue
+        if signed == 0:
+            errors += 1
+            continue
+        parsed.append(_tx(date_str, signed, row[desc_col] if desc_col is not None else '',
+                          tx_type, category, mapping['default_category']))
+    return parsed, errors
+
+
+def parse_ofx_blocks(default_category, blocks):
+    parsed, errors = [], 0
+    for block in blocks:
+        fields = {tag.upper(): value.strip() for tag, value in _OFX_TAG.findall(block)}
+        try:
+            date_str = datetime.strptime(fields['DTPOSTED'][:8], '%Y%m%d').strftime('%Y-%m-%d')
+            signed = float(fields['TRNAMT'])
+        except (KeyError, ValueError):
+            errors += 1
+            continue
+        if signed == 0:
+            errors += 1
+            continue
+        name, memo = fields.get('NAME', ''), fields.get('MEMO', '')
+        description = f"{name} - {memo}" if name and memo and memo != name else (name or memo)
+        parsed.append(_tx(date_str, signed, description, default_category=default_category))
+    return parsed, errors
+
+
+# --- Chunking ---
+def _column(header, spec):
+    if spec is None or isinstance(spec, int):
+        return spec
+    try:
+        return header.index(spec)
+    except ValueError:
+        raise ValueError(f"Column '{spec}' not found in the statement header") from None
+
+
+def _csv_jobs(path, mapping, chunk_size):
+    with open(path, 'r', encoding=mapping['encoding'], newline='') as f:
+        reader = csv.reader(f, delimiter=mapping['delimiter'])
+        header = [h.strip() for h in next(reader, [])]
+        columns = tuple(_column(header, mapping[name]) for name in COLUMN_FIELDS)
+        if columns[0] is None or (columns[1] is None and None in columns[2:4]):
+            raise ValueError("The mapping needs a date column and an amount (or debit and credit) column")
+        worker = partial(parse_csv_rows, columns, mapping)
+        while True:
+            rows = list(islice(reader, chunk_size))
+            if not rows:
+                return
+            yield worker, rows
+
+
+def _ofx_jobs(path, mapping, chunk_size):
+    worker = partial(parse_ofx_blocks, mapping['default_category'])
+    with open(path, 'r', encoding='utf-8', errors='replace') as f:
+        buf, blocks = "", []
+        for data in iter(lambda: f.read(1 << 20), ""):
+            parts = (buf + data).split('</STMTTRN>')
+            buf = parts.pop()
+            for part in parts:
+                start = part.find('<STMTTRN>')
+                if start >= 0:
+                    blocks.append(part[start + len('<STMTTRN>'):])
+            while len(blocks) >= chunk_size:
+                yield worker, blocks[:chunk_size]
+                blocks = blocks[chunk_size:]
+        if blocks:
+            yield worker, blocks
+
+
+def _run_jobs(jobs, workers, cancelled):
+    # Results in file order. A single chunk is parsed inline; otherwise at most
+    # two chunks per worker are in flight so memory stays bounded.
+    first = list(islice(jobs, 2))
+    if len(first) < 2 or workers == 1:
+        for fn, arg in chain(first, jobs):
+            if cancelled is not None and cancelled():
+                return
+            yield fn(arg)
+        return
+    # spawn: the caller may be a thread of a Tk process
+    with ProcessPoolExecutor(workers, mp_context=get_context('spawn')) as pool:
+        pending = deque(pool.submit(fn, arg) for fn, arg in first)
+        for fn, arg in jobs:
+            if cancelled is not None and cancelled():
+                pool.shutdown(cancel_futures=True)
+                return
+            pending.append(pool.submit(fn, arg))
+            if len(pending) >= 2 * workers:
+                yield pending.popleft().result()
+        while pending:
+            yield pending.popleft().result()
+
+
+def parse_statement(path, mapping=None, cancelled=None, workers=None, chunk_size=STATEMENT_CHUNK):
+    # Returns ([(key, tx), ...], unparseable row count); tx ids are left None
+    mapping = dict(CSV_MAPPING, **(mapping or {}))
+    if os.path.splitext(path)[1].lower() in ('.ofx', '.qfx'):
+        jobs = _ofx_jobs(path, mapping, chunk_size)
+    else:
+        jobs = _csv_jobs(path, mapping, chunk_size)
+    parsed, errors = [], 0
+    for rows, bad in _run_jobs(jobs, workers or os.cpu_count() or 1, cancelled):
+        parsed += rows
+        errors += bad
+    return parsed, errors
+
+
+# --- Dedup ---
+def existing_keys(csv_chunks):
+    # Multiset of statement keys for rows already in the wallet (from a store's csv_chunks())
+    keys = Counter()
+    for chunk in csv_chunks:
+        keys.update(statement_key(date_str, amount, description)
+                    for _, date_str, _, _, amount, description in chunk)
+    return keys
+
+
+def dedupe(parsed, keys):
+    # Each existing row absorbs one identical statement row, so two equal
+    # purchases on one day still import once, and re-imports add nothing
+    fresh, skipped = [], 0
+    for key, tx in parsed:
+        if keys[key] > 0:
+            keys[key] -= 1
+            skipped += 1
+        else:
+            fresh.append(tx)
+    return fresh, skipped
@@ -0,0 +1,161 @@
+import argparse
+import json
+import os
+import sys
+from concurrent.futures import ProcessPoolExecutor
+from datetime import datetime
+from multiprocessing import get_context
+
+from wallet_core import WalletLedger, effective_budgets, month_arg
+from wallet_journal import TransactionJournal
+from wallet_sqlite import read_summary
+from wallet_recurring import RecurringRule
+
+# Many wallet files (one per cost center, say) read as shards of one workspace.
+# Each shard is loaded in its own process and reduced to its (month, type,
+# category) rollup plus budgets; only those small results cross back and are
+# merged, so a report costs about as much as loading the largest shard.
+#   python wallet_workspace.py sales.json ops.json archive/*.db --month 2026-10
+
+
+def shard_spec(path):
+    # (name, storage mode, data file, db file); .db files are sqlite shards,
+    # anything else a JSON snapshot with its optional journal
+    name, ext = os.path.splitext(os.path.basename(path))
+    if ext.lower() == '.db':
+        return name, 'sqlite', None, path
+    return name, 'journal', path, None
+
+
+def read_shard(spec):
+    # Runs in a worker process. Only the rollup cells and settings are built:
+    # a sqlite shard is read from its rollups table on a read-only connection,
+    # a JSON shard is replayed and grouped without a store or search index
+    name, storage_mode, data_file, db_file = spec
+    if storage_mode == 'sqlite':
+        summary = read_summary(db_file)
+    else:
+        journal = TransactionJournal(data_file)
+        if not (os.path.exists(journal.snapshot_path) or os.path.exists(journal.journal_path)):
+            raise FileNotFoundError(f"No wallet file at {data_file}")
+        summary = journal.load()
+        cells = {}
+        for tx in summary['transactions']:
+            cell = cells.setdefault((tx.date[:7], tx.type, tx.category), [0, 0])
+            cell[0] += tx.cents
+            cell[1] += 1
+        summary['count'] = len(summary['transactions'])
+        summary['cells'] = [key + tuple(cell) for key, cell in cells.items()]
+    return {
+        'name': name,
+        'count': summary['count'],
+        'cells': [tuple(cell) for cell in summary['cells']],
+        'categories': summary['categories'] or [],
+        'budget_limits': dict(summary['budget_limits'] or {}),
+        'budget_history': summary['budget_history'] or {},
+        'recurring': summary['recurring'] or [],
+    }
+
+
+class WorkspaceReport(WalletLedger):
+    # Read-only ledger over the merged shard rollups: overview(), forecast(),
+    # budget_status() and the aggregates' category and monthly views all work
+    # as they do for one wallet. Budgets add up across shards per month.
+    def __init__(self, shards):
+        super().__init__(storage_mode=None, data_file=os.devnull, on_snapshot_save=lambda: None)
+        self.shards = shards
+        self.aggregates.load_cells(cell for shard in shards for cell in shard['cells'])
+        for shard in shards:
+            self.merge_categories(shard['categories'])
+        # rule ids are per wallet
+        self.recurring = {(shard['name'], r['id']): RecurringRule.from_dict(r)
+                          for shard in shards for r in shard['recurring']}
+        self.sync_recurring()
+
+    def budget_for(self, month):
+        limits = {}
+        for shard in self.shards:
+            for category, limit in effective_budgets(shard['budget_limits'], shard['budget_history'], month).items():
+                limits[category] = limits.get(category, 0.0) + limit
+        return limits
+
+    def shard_totals(self):
+        # name -> (transactions, income, expenses)
+        totals = {}
+        for shard in self.shards:
+            income = sum(cell[3] for cell in shard['cells'] if cell[1] == 'Income')
+            expenses = sum(cell[3] for cell in shard['cells'] if cell[1] != 'Income')
+            totals[shard['name']] = (shard['count'], income / 100, expenses / 100)
+        return totals
+
+    def record(self, op, data):
+        raise ValueError("A workspace report is read-only; change the shard wallets instead.")
+
+
+class Workspace:
+    def __init__(self, paths):
+        self.specs = [shard_spec(p) for p in paths]
+        names = [spec[0] for spec in self.specs]
+        if len(set(names)) != len(names):
+            raise ValueError("Shard file names must be unique")
+
+    def report(self, workers=None):
+        workers = min(workers or os.cpu_count() or 1, len(self.specs))
+        if workers <= 1:
+            shards = [read_shard(spec) for spec in self.specs]
+        else:
+            # spawn: the caller may be a thread of a Tk process
+            with ProcessPoolExecutor(workers, mp_context=get_context('spawn')) as pool:
+                shards = list(pool.map(read_shard, self.specs))
+        return WorkspaceReport(shards)
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Consolidated report over several wallet files")
+    parser.add_argument('wallets', nargs='+', help="wallet .json files (journal/snapshot) or sqlite .db files")
+    parser.add_argument('--month', type=month_arg, help="YYYY-MM, default the current month")
+    parser.add_argument('--workers', type=int)
+    parser.add_argument('--json', action='store_true', help="print the report as JSON")
+    args = parser.parse_args(argv)
+
+    report = Workspace(args.wallets).report(args.workers)
+    month = args.month or datetime.now().strftime("%Y-%m")
+    overview = report.overview(month)
+    rows, alerts = report.budget_status(month)
+    spend = report.aggregates.category_totals('Expense')
+    monthly = report.aggregates.monthly_income_expenses()
+    if args.json:
+        json.dump({
+            'month': month,
+            'shards': {name: dict(zip(('count', 'income', 'expenses'), t))
+                       for name, t in report.shard_totals().items()},
+            'overview': overview,
+            'category_spend': spend,
+            'budget': [dict(zip(('category', 'limit', 'spent', 'remaining', 'status', 'forecast'), row))
+                       for row in rows],
+            'alerts': alerts,
+            'monthly': dict(sorted(monthly.items())),
+        }, sys.stdout, ensure_ascii=False, indent=2)
+        print()
+        return 0
+
+    print(f"{'Wallet':<20}{'Transactions':>14}{'Income':>14}{'Expenses':>14}")
+    for name, (count, income, expenses) in report.shard_totals().items():
+        print(f"{name:<20}{count:>14}{income:>14.2f}{expenses:>14.2f}")
+    print(f"{'All wallets':<20}{overview['count']:>14}{overview['total_income']:>14.2f}"
+          f"{overview['total_expenses']:>14.2f}\n")
+    print("Spend by category")
+    for category, total in sorted(spend.items(), key=lambda item: -item[1]):
+        print(f"  {category:<18}{total:>14.2f}")
+    print(f"\nBudgets for {month}")
+    for category, budget_limit, spent, remaining, status, projected in rows:
+        print(f"  {category:<18}{budget_limit:>10.2f}{spent:>10.2f}{remaining:>10.2f}{projected:>10.2f}  {status}")
+    print("  " + "\n  ".join(alerts))
+    print("\nMonthly trend")
+    for m, values in sorted(monthly.items())[-12:]:
+        print(f"  {m}  income {values['income']:>12.2f}  expenses {values['expenses']:>12.2f}")
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())